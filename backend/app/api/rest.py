@@ -1,28 +1,23 @@
 """
 REST API endpoints for game management
 """
-from fastapi import APIRouter, HTTPException
-from typing import List
+import orjson
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from app.network.rooms import RoomManager
+from app.api.websocket import room_manager  # Shared with the WebSocket endpoint, which owns the rooms
 from app.config.settings import settings
 
 
 router = APIRouter()
 
-# Room manager instance (in real app, this would be dependency injected)
-room_manager = RoomManager()
-
-
-class RoomInfo(BaseModel):
-    """Room information response model"""
-    room_id: str
-    name: str
-    player_count: int
-    max_players: int
-    is_full: bool
-    created_at: str
+# Settings are loaded once at startup, so the config response is constant
+_CONFIG_RESPONSE = orjson.dumps({
+    "max_players_per_room": settings.max_players_per_room,
+    "game_tick_rate": settings.game_tick_rate,
+    "physics_update_rate": settings.physics_update_rate
+})
 
 
 class GameStats(BaseModel):
@@ -38,32 +33,20 @@ async def health_check():
     return {"status": "healthy", "service": "tannenbaumbiel-backend"}
 
 
-@router.get("/rooms", response_model=List[RoomInfo])
+@router.get("/rooms", response_class=ORJSONResponse)
 async def list_rooms():
     """List all active game rooms"""
-    rooms = room_manager.list_rooms()
-    return [RoomInfo(**room) for room in rooms]
+    # No response_model: room dicts are built internally, so response_class serializes them as-is
+    return room_manager.list_rooms()
 
 
 @router.get("/stats", response_model=GameStats)
 async def get_game_stats():
     """Get current game statistics"""
-    rooms = room_manager.list_rooms()
-    total_players = sum(room["player_count"] for room in rooms)
-    active_games = sum(1 for room in rooms if room["player_count"] > 1)
-
-    return GameStats(
-        total_rooms=len(rooms),
-        total_players=total_players,
-        active_games=active_games
-    )
+    return GameStats(**room_manager.get_stats())
 
 
 @router.get("/config")
 async def get_game_config():
     """Get game configuration"""
-    return {
-        "max_players_per_room": settings.max_players_per_room,
-        "game_tick_rate": settings.game_tick_rate,
-        "physics_update_rate": settings.physics_update_rate
-    }
+    return Response(_CONFIG_RESPONSE, media_type="application/json")
@@ -1,23 +1,50 @@
 """
 WebSocket endpoints for real-time game communication
 """
-import json
 import asyncio
-from typing import Dict, Set
+import logging
+import msgspec
+import orjson
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Union
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from fastapi.websockets import WebSocketState
+from pydantic import BaseModel, TypeAdapter
 
 from app.config.settings import settings
 from app.network.session import SessionManager
 from app.network.rooms import RoomManager
 from app.game.world import world_manager
 from app.network.protocol import (
-    GameMessage, MessageType, JoinRoomData, PlayerInputData, InputAction,
-    ConnectionState, ReadyForWorldData, WorldReadyData, ClientReadyData
+    GameMessage, InboundMessage, MessageType, JoinRoomData, PlayerInputData, InputAction,
+    ConnectionState, ReadyForWorldData, WorldReadyData, ClientReadyData, ClientStateUpdate
 )
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Maximum number of serialized messages waiting to be sent to one connection
+OUTBOUND_QUEUE_SIZE = 256
+# Maximum number of queued messages coalesced into one batch frame
+MAX_BATCH_SIZE = 128
+
+# World ticks between full game state broadcasts; the ones in between are deltas.
+# Keyframes resynchronize clients that dropped a delta or joined late.
+KEYFRAME_INTERVAL_TICKS = 60
+
+# Inbound limits: frames larger than MAX_MESSAGE_SIZE bytes (UTF-8 encoded for text
+# frames) close the connection, player inputs beyond the token bucket (INPUT_RATE per
+# second, bursts up to INPUT_BURST) are dropped, and state updates may list at most
+# MAX_STATE_UPDATE_ENTITIES enemies/projectiles
+MAX_MESSAGE_SIZE = 64 * 1024
+INPUT_RATE = 30.0
+INPUT_BURST = 60.0
+MAX_STATE_UPDATE_ENTITIES = 64
+
+# Inbound envelopes are parsed and validated straight from the frame
+JSON_DECODER = msgspec.json.Decoder(InboundMessage)
+MSGPACK_DECODER = msgspec.msgpack.Decoder(InboundMessage)
 
 # Global managers
 session_manager = SessionManager()
@@ -36,81 +63,285 @@ async def shutdown_event():
     await world_manager.stop()
 
 
+# pydantic-core serializes models straight to JSON bytes, without an intermediate dict
+GAME_MESSAGE_ADAPTER = TypeAdapter(GameMessage)
+
+
+def _dumps(message: GameMessage) -> bytes:
+    """Serialize a message to JSON bytes"""
+    return GAME_MESSAGE_ADAPTER.dump_json(message)
+
+
+# Constant leading bytes of each message type's envelope, up to the timestamp value
+_ENVELOPE_HEADERS = {
+    message_type: b'{"type":' + orjson.dumps(message_type) + b',"timestamp":'
+    for message_type in MessageType
+}
+
+
+def _envelope(message_type: MessageType, timestamp: float, data: Union[Dict[str, Any], BaseModel, None] = None,
+              connection_state: Optional[ConnectionState] = None) -> bytes:
+    """Serialize an outbound message from its fields without building a GameMessage
+
+    Model data is serialized by pydantic-core; the pieces are joined onto a
+    precomputed header instead of going through an intermediate dict.
+    """
+    if isinstance(data, BaseModel):
+        data_json = data.__pydantic_serializer__.to_json(data)
+    else:
+        data_json = orjson.dumps(data)
+    return b"".join((
+        _ENVELOPE_HEADERS[message_type],
+        orjson.dumps(timestamp),
+        b',"data":',
+        data_json,
+        b',"connection_state":',
+        orjson.dumps(connection_state),
+        b"}"
+    ))
+
+
+def _game_state_data(room_id: str, tick: int, entities: Dict[str, Dict[str, bytes]]) -> Dict[str, Any]:
+    """Full game state data (the GameStateData shape) from a world's cached entity JSON"""
+    data: Dict[str, Any] = {"room_id": room_id, "tick": tick}
+    for collection, current in entities.items():
+        data[collection] = [orjson.Fragment(entity_json) for entity_json in current.values()]
+    return data
+
+
+@dataclass(slots=True)
+class ConnectionEntry:
+    """Everything tracked for one WebSocket connection"""
+    websocket: WebSocket
+    state: ConnectionState
+    outbound_queue: asyncio.Queue  # Serialized messages waiting for the writer
+    writer_task: Optional[asyncio.Task] = None
+    room_id: Optional[str] = None
+    input_tokens: float = INPUT_BURST  # Player input token bucket
+    input_refill_time: float = 0.0
+
+
 class ConnectionManager:
     """Manages WebSocket connections"""
 
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.connection_rooms: Dict[str, str] = {}  # connection_id -> room_id
-        self.connection_states: Dict[str, ConnectionState] = {}  # connection_id -> state
+        self.connections: Dict[str, ConnectionEntry] = {}  # connection_id -> entry
+        # room_id -> (connection_id, entry) recipients, rebuilt on join/leave so broadcasts
+        # iterate an immutable tuple without per-recipient lookups
+        self._room_targets: Dict[str, Tuple[Tuple[str, ConnectionEntry], ...]] = {}
+        self._last_broadcast_version: Dict[str, int] = {}  # room_id -> world.state_version
+        # room_id -> collection -> entity_id -> JSON last broadcast, the base for the next delta
+        self._last_broadcast_entities: Dict[str, Dict[str, Dict[str, bytes]]] = {}
+        self._last_keyframe_tick: Dict[str, int] = {}  # room_id -> world.tick
 
     async def connect(self, websocket: WebSocket, connection_id: str):
         """Accept new WebSocket connection"""
         await websocket.accept()
-        self.active_connections[connection_id] = websocket
-        self.connection_states[connection_id] = ConnectionState.CONNECTED
-        print(f"Connection {connection_id} established with state {ConnectionState.CONNECTED}")
+        entry = ConnectionEntry(
+            websocket=websocket,
+            state=ConnectionState.CONNECTED,
+            outbound_queue=asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        )
+        entry.writer_task = asyncio.create_task(self._writer(connection_id, entry))
+        self.connections[connection_id] = entry
+        logger.info("Connection %s established with state %s", connection_id, ConnectionState.CONNECTED)
 
     def disconnect(self, connection_id: str):
         """Remove connection and clean up"""
-        if connection_id in self.active_connections:
+        entry = self.connections.pop(connection_id, None)
+        if entry:
             # Leave room if in one
-            if connection_id in self.connection_rooms:
-                room_id = self.connection_rooms[connection_id]
-                room_manager.leave_room(room_id, connection_id)
-                del self.connection_rooms[connection_id]
-
-            # Clean up state tracking
-            if connection_id in self.connection_states:
-                del self.connection_states[connection_id]
-
-            del self.active_connections[connection_id]
-            print(f"Connection {connection_id} disconnected")
+            if entry.room_id:
+                room_manager.leave_room(entry.room_id, connection_id)
+                self._set_entry_room(connection_id, entry, None)
+
+            # Stop the writer, anything still queued is dropped
+            if entry.writer_task:
+                entry.writer_task.cancel()
+
+            logger.info("Connection %s disconnected", connection_id)
+
+    def get_room_id(self, connection_id: str) -> Optional[str]:
+        """Get the room a connection is in, if any"""
+        entry = self.connections.get(connection_id)
+        return entry.room_id if entry else None
+
+    def set_room_id(self, connection_id: str, room_id: Optional[str]):
+        """Set (or clear with None) the room a connection is in"""
+        entry = self.connections.get(connection_id)
+        if entry:
+            self._set_entry_room(connection_id, entry, room_id)
+
+    def _set_entry_room(self, connection_id: str, entry: ConnectionEntry, room_id: Optional[str]):
+        """Move an entry between rooms, keeping the broadcast target tuples in sync"""
+        old_room_id = entry.room_id
+        if old_room_id == room_id:
+            return
+        if old_room_id is not None:
+            targets = tuple(target for target in self._room_targets.get(old_room_id, ())
+                            if target[0] != connection_id)
+            if targets:
+                self._room_targets[old_room_id] = targets
+            else:
+                self._room_targets.pop(old_room_id, None)
+        if room_id is not None:
+            self._room_targets[room_id] = self._room_targets.get(room_id, ()) + ((connection_id, entry),)
+        entry.room_id = room_id
+
+    def allow_input(self, connection_id: str) -> bool:
+        """Take one token from the connection's player input bucket, False when it is empty"""
+        entry = self.connections.get(connection_id)
+        if entry is None:
+            return False
+        now = asyncio.get_running_loop().time()
+        if entry.input_refill_time:
+            entry.input_tokens = min(INPUT_BURST, entry.input_tokens + (now - entry.input_refill_time) * INPUT_RATE)
+        entry.input_refill_time = now
+        if entry.input_tokens < 1.0:
+            return False
+        entry.input_tokens -= 1.0
+        return True
 
     def get_connection_state(self, connection_id: str) -> ConnectionState:
         """Get current connection state"""
-        return self.connection_states.get(connection_id, ConnectionState.DISCONNECTED)
+        entry = self.connections.get(connection_id)
+        return entry.state if entry else ConnectionState.DISCONNECTED
 
     def set_connection_state(self, connection_id: str, state: ConnectionState):
         """Set connection state"""
-        old_state = self.connection_states.get(connection_id, ConnectionState.DISCONNECTED)
-        self.connection_states[connection_id] = state
-        print(f"🔄 Connection {connection_id} state: {old_state} → {state}")
-
-    def validate_state_transition(self, connection_id: str, required_state: ConnectionState) -> bool:
-        """Validate that connection is in required state"""
+        entry = self.connections.get(connection_id)
+        if entry and entry.state != state:
+            old_state = entry.state
+            entry.state = state
+            logger.debug("🔄 Connection %s state: %s → %s", connection_id, old_state, state)
+
+    def validate_state_transition(self, connection_id: str, required_state: ConnectionState) -> Tuple[bool, ConnectionState]:
+        """Validate that connection is in required state, also returning the current state"""
         current_state = self.get_connection_state(connection_id)
-        return current_state == required_state
+        return current_state == required_state, current_state
 
     async def send_message(self, connection_id: str, message: GameMessage):
         """Send message to specific connection"""
-        if connection_id in self.active_connections:
-            websocket = self.active_connections[connection_id]
+        self.send_raw(connection_id, _dumps(message))
+
+    def send_raw(self, connection_id: str, payload: bytes):
+        """Queue an already serialized message for specific connection"""
+        self._enqueue(connection_id, payload.decode())
+
+    def _enqueue(self, connection_id: str, text: str):
+        """Queue message text (decoded once per message, not per recipient) for the writer"""
+        entry = self.connections.get(connection_id)
+        if entry is not None:
+            self._enqueue_entry(connection_id, entry, text)
+
+    def _enqueue_entry(self, connection_id: str, entry: ConnectionEntry, text: str):
+        """Queue message text on an already looked up entry"""
+        # Skip connections whose writer has stopped, nothing would drain their queue
+        if not entry.writer_task.done():
+            queue = entry.outbound_queue
+            if queue.full():
+                # Slow consumer: drop the oldest message, newer state supersedes it
+                queue.get_nowait()
+                logger.warning("Outbound queue full for %s, dropping oldest message", connection_id)
+            queue.put_nowait(text)
+
+    async def _writer(self, connection_id: str, entry: ConnectionEntry):
+        """Send queued messages, coalescing everything queued since the last send into one frame"""
+        queue = entry.outbound_queue
+        websocket = entry.websocket
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # Let producers that are ready in this loop iteration enqueue first
+            await asyncio.sleep(0)
+            while len(batch) < MAX_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            if len(batch) == 1:
+                payload = batch[0]
+            else:
+                payload = orjson.dumps({
+                    "type": MessageType.BATCH,
+                    "timestamp": loop.time(),
+                    "data": {"messages": [orjson.Fragment(message) for message in batch]}
+                }).decode()
+
             if websocket.client_state == WebSocketState.CONNECTED:
-                await websocket.send_text(message.model_dump_json())
+                try:
+                    # Sent as a text frame, the client parses text frames as JSON
+                    await websocket.send_text(payload)
+                except Exception as e:
+                    # The task finishing marks the entry dead for _enqueue
+                    logger.info("Writer for %s stopped: %s", connection_id, e)
+                    return
 
     async def broadcast_to_room(self, room_id: str, message: GameMessage, exclude: Set[str] = None):
         """Broadcast message to all connections in a room"""
+        # Serialize once for all recipients
+        self.broadcast_raw(room_id, _dumps(message), exclude)
+
+    def broadcast_raw(self, room_id: str, payload: bytes, exclude: Set[str] = None):
+        """Broadcast an already serialized message to all connections in a room"""
         if exclude is None:
             exclude = set()
 
-        room = room_manager.get_room(room_id)
-        if room:
-            for connection_id in room._active_connections.keys():
+        # The tuple is replaced, never mutated, on join/leave, so iterating it is safe
+        targets = self._room_targets.get(room_id)
+        if targets:
+            text = payload.decode()
+            for connection_id, entry in targets:
                 if connection_id not in exclude:
-                    await self.send_message(connection_id, message)
+                    self._enqueue_entry(connection_id, entry, text)
 
-    async def broadcast_game_state(self, room_id: str):
-        """Broadcast current game state to all players in room"""
+    async def broadcast_game_state(self, room_id: str, timestamp: Optional[float] = None):
+        """Broadcast current game state to all players in room
+
+        Callers broadcasting several rooms at once can pass one shared timestamp.
+        Skipped when the world has not changed since the last broadcast. Every
+        KEYFRAME_INTERVAL_TICKS a full game state is sent, otherwise a
+        game_state_delta with only the entities that changed or were removed,
+        or nothing at all when no entity did.
+        """
         world = world_manager.get_world(room_id)
-        if world:
-            game_state = world.get_game_state()
-            message = GameMessage(
-                type=MessageType.GAME_STATE,
-                timestamp=asyncio.get_event_loop().time(),
-                data=game_state.model_dump()
-            )
-            await self.broadcast_to_room(room_id, message)
+        if not world:
+            self._last_broadcast_version.pop(room_id, None)
+            self._last_broadcast_entities.pop(room_id, None)
+            self._last_keyframe_tick.pop(room_id, None)
+            return
+        if self._last_broadcast_version.get(room_id) == world.state_version:
+            return
+        if timestamp is None:
+            timestamp = asyncio.get_running_loop().time()
+
+        # Entity JSON is cached on the world per state version; the same bytes
+        # are sent and kept as the base for the next diff
+        entities = world.get_entity_json()
+        previous = self._last_broadcast_entities.get(room_id)
+        ticks_since_keyframe = world.tick - self._last_keyframe_tick.get(room_id, world.tick)
+
+        if previous is None or not 0 <= ticks_since_keyframe < KEYFRAME_INTERVAL_TICKS:
+            message_type = MessageType.GAME_STATE
+            data = _game_state_data(room_id, world.tick, entities)
+            self._last_keyframe_tick[room_id] = world.tick
+        else:
+            message_type = MessageType.GAME_STATE_DELTA
+            data: Dict[str, Any] = {"room_id": room_id, "tick": world.tick}
+            changed = False
+            for collection, current in entities.items():
+                last = previous[collection]
+                updated = [orjson.Fragment(entity_json) for entity_id, entity_json in current.items()
+                           if last.get(entity_id) != entity_json]
+                removed = [entity_id for entity_id in last if entity_id not in current]
+                data[collection] = {"updated": updated, "removed": removed}
+                changed = changed or bool(updated or removed)
+            if not changed:
+                # A version bump that left every entity's JSON as it was, nothing to send
+                self._last_broadcast_version[room_id] = world.state_version
+                return
+
+        self.broadcast_raw(room_id, _envelope(message_type, timestamp, data))
+        self._last_broadcast_version[room_id] = world.state_version
+        self._last_broadcast_entities[room_id] = entities
 
 
 # Global connection manager
@@ -128,21 +359,41 @@ async def websocket_game_endpoint(websocket: WebSocket):
 
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_text()
-
+            # Receive message from client (text frames are JSON, binary frames MessagePack)
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+
+            # Parse and validate the envelope
+            text = frame.get("text")
+            if text is not None:
+                # A character is 1-4 bytes in UTF-8, only encode when the length alone cannot decide
+                size = len(text)
+                if size <= MAX_MESSAGE_SIZE < size * 4:
+                    size = len(text.encode())
+            else:
+                size = len(frame["bytes"])
+            if size > MAX_MESSAGE_SIZE:
+                logger.warning("Closing %s: message larger than %d", connection_id, MAX_MESSAGE_SIZE)
+                await websocket.close(code=1009)  # Message too big
+                raise WebSocketDisconnect(1009)
             try:
-                # Parse message
-                message_dict = json.loads(data)
-                message = GameMessage(**message_dict)
-
-                # Handle message based on type
-                await handle_message(connection_id, message)
-
-            except json.JSONDecodeError:
-                await send_error(connection_id, "INVALID_JSON", "Invalid JSON format")
-            except Exception as e:
+                if text is not None:
+                    message = JSON_DECODER.decode(text)
+                else:
+                    message = MSGPACK_DECODER.decode(frame["bytes"])
+            except msgspec.ValidationError as e:
                 await send_error(connection_id, "MESSAGE_ERROR", str(e))
+                continue
+            except msgspec.DecodeError:
+                if text is not None:
+                    await send_error(connection_id, "INVALID_JSON", "Invalid JSON format")
+                else:
+                    await send_error(connection_id, "INVALID_MSGPACK", "Invalid MessagePack format")
+                continue
+
+            # Handle message based on type (handlers report their own errors)
+            await handle_message(connection_id, message)
 
     except WebSocketDisconnect:
         # Handle disconnect - clean up room and game world
@@ -155,16 +406,14 @@ async def websocket_game_endpoint(websocket: WebSocket):
             if world:
                 world.remove_player(connection_id)
 
-                # Remove world if no players left
+                # Remove world if no players left; otherwise the next
+                # world tick broadcasts the updated game state
                 if not world.has_players():
                     world_manager.remove_world(room_id)
-                else:
-                    # Broadcast updated game state to remaining players
-                    await connection_manager.broadcast_game_state(room_id)
 
-            print(f"Player {connection_id} disconnected from room {room_id}")
+            logger.info("Player %s disconnected from room %s", connection_id, room_id)
     except Exception as e:
-        print(f"WebSocket error for {connection_id}: {e}")
+        logger.error("WebSocket error for %s: %s", connection_id, e)
 
         # Clean up on error
         room_id = room_manager.disconnect_player(connection_id)
@@ -178,46 +427,27 @@ async def websocket_game_endpoint(websocket: WebSocket):
                     world_manager.remove_world(room_id)
 
 
-async def handle_message(connection_id: str, message: GameMessage):
-    """Handle incoming WebSocket message"""
-    print(f"🔧 Backend: Received message type '{message.type}' from {connection_id}")
-
-    if message.type == MessageType.JOIN_ROOM:
-        await handle_join_room(connection_id, message)
-
-    elif message.type == MessageType.LEAVE_ROOM:
-        await handle_leave_room(connection_id, message)
-
-    elif message.type == MessageType.PLAYER_INPUT:
-        await handle_player_input(connection_id, message)
-
-    elif message.type == MessageType.PING:
-        await handle_ping(connection_id, message)
-
-    elif message.type == MessageType.GAME_STATE_UPDATE:
-        await handle_game_state_update(connection_id, message)
-
-    elif message.type == MessageType.REQUEST_WORLD_STATE:
-        await handle_request_world_state(connection_id, message)
-
-    elif message.type == MessageType.READY_FOR_WORLD:
-        await handle_ready_for_world(connection_id, message)
-
-    elif message.type == MessageType.WORLD_READY:
-        await handle_world_ready(connection_id, message)
+async def handle_message(connection_id: str, message: InboundMessage):
+    """Handle incoming WebSocket message
 
-    elif message.type == MessageType.CLIENT_READY:
-        await handle_client_ready(connection_id, message)
+    The envelope (type and timestamp) was validated on decode;
+    the inner data is validated by the handler's own model.
+    """
+    logger.debug("🔧 Backend: Received message type '%s' from %s", message.type, connection_id)
 
-    else:
+    handler = MESSAGE_HANDLERS.get(message.type)
+    if handler is None:
         await send_error(connection_id, "UNKNOWN_MESSAGE_TYPE", f"Unknown message type: {message.type}")
+        return
+
+    await handler(connection_id, message.data, message.timestamp)
 
 
-async def handle_join_room(connection_id: str, message: GameMessage):
+async def handle_join_room(connection_id: str, data: Dict[str, Any], timestamp: float):
     """Handle room join request"""
     try:
-        print(f"🔧 Backend: Handling join room request for {connection_id}")
-        join_data = JoinRoomData(**message.data)
+        logger.debug("🔧 Backend: Handling join room request for %s", connection_id)
+        join_data = msgspec.convert(data, JoinRoomData)
 
         # Create session for player (this creates or updates player in database)
         session_id = session_manager.create_session(join_data.username)
@@ -232,15 +462,15 @@ async def handle_join_room(connection_id: str, message: GameMessage):
         room = room_manager.join_room(join_data.room_name, connection_id, player)
 
         if room:
-            print(f"🔧 Backend: Player {connection_id} joined room {room.room_id}")
+            logger.info("🔧 Backend: Player %s joined room %s", connection_id, room.room_id)
             # Track connection-room mapping
-            connection_manager.connection_rooms[connection_id] = room.room_id
+            connection_manager.set_room_id(connection_id, room.room_id)
 
             # Create or get game world for this room
             world = world_manager.get_world(room.room_id)
             if not world:
                 world = world_manager.create_world(room.room_id)
-                print(f"🔧 Backend: Created new world for room {room.room_id}")
+                logger.info("🔧 Backend: Created new world for room %s", room.room_id)
 
             # Add player to game world
             player_state = world.add_player(
@@ -256,7 +486,7 @@ async def handle_join_room(connection_id: str, message: GameMessage):
             # Send ONLY room_joined confirmation - wait for client acknowledgment before sending world state
             response = GameMessage(
                 type=MessageType.ROOM_JOINED,
-                timestamp=message.timestamp,
+                timestamp=timestamp,
                 connection_state=ConnectionState.ROOM_JOINED,
                 data={
                     "room_id": room.room_id,
@@ -267,13 +497,13 @@ async def handle_join_room(connection_id: str, message: GameMessage):
                 }
             )
             await connection_manager.send_message(connection_id, response)
-            print(f"🔧 Backend: Sent room_joined message to {connection_id}, waiting for ready_for_world acknowledgment")
+            logger.debug("🔧 Backend: Sent room_joined message to %s, waiting for ready_for_world acknowledgment", connection_id)
 
             # Notify other players
             if room.get_active_connection_count() > 1:
                 broadcast_message = GameMessage(
                     type=MessageType.PLAYER_JOINED,
-                    timestamp=message.timestamp,
+                    timestamp=timestamp,
                     data={
                         "username": join_data.username,
                         "player_count": room.get_active_connection_count()
@@ -288,75 +518,80 @@ async def handle_join_room(connection_id: str, message: GameMessage):
             await send_error(connection_id, "ROOM_JOIN_FAILED", "Failed to join room (may be full or player already in another room)")
 
     except Exception as e:
-        print(f"🔧 Backend: Error in handle_join_room for {connection_id}: {e}")
+        logger.error("🔧 Backend: Error in handle_join_room for %s: %s", connection_id, e)
         await send_error(connection_id, "JOIN_ROOM_ERROR", str(e))
 
 
-async def handle_leave_room(connection_id: str, message: GameMessage):
+async def handle_leave_room(connection_id: str, data: Dict[str, Any], timestamp: float):
     """Handle room leave request"""
-    if connection_id in connection_manager.connection_rooms:
-        room_id = connection_manager.connection_rooms[connection_id]
-        room = room_manager.leave_room(room_id, connection_id)
-
-        if room:
-            # Remove player from game world
-            world = world_manager.get_world(room_id)
-            if world:
-                world.remove_player(connection_id)
-
-                # Remove world if no players left
-                if not world.has_players():
-                    world_manager.remove_world(room_id)
-
-            # Remove from tracking
-            del connection_manager.connection_rooms[connection_id]
-
-            # Send confirmation
-            response = GameMessage(
-                type=MessageType.ROOM_LEFT,
-                timestamp=message.timestamp,
-                data={"room_id": room_id}
-            )
-            await connection_manager.send_message(connection_id, response)
-
-            # Notify other players and broadcast updated game state
-            if room.get_active_connection_count() > 0:
-                broadcast_message = GameMessage(
-                    type=MessageType.PLAYER_LEFT,
-                    timestamp=message.timestamp,
-                    data={"player_count": room.get_active_connection_count()}
+    try:
+        room_id = connection_manager.get_room_id(connection_id)
+        if room_id:
+            room = room_manager.leave_room(room_id, connection_id)
+
+            if room:
+                # Remove player from game world
+                world = world_manager.get_world(room_id)
+                if world:
+                    world.remove_player(connection_id)
+
+                    # Remove world if no players left
+                    if not world.has_players():
+                        world_manager.remove_world(room_id)
+
+                # Remove from tracking
+                connection_manager.set_room_id(connection_id, None)
+
+                # Send confirmation
+                response = GameMessage(
+                    type=MessageType.ROOM_LEFT,
+                    timestamp=timestamp,
+                    data={"room_id": room_id}
                 )
-                await connection_manager.broadcast_to_room(room_id, broadcast_message)
+                await connection_manager.send_message(connection_id, response)
+
+                # Notify other players; the updated game state goes out
+                # with the next world tick
+                if room.get_active_connection_count() > 0:
+                    broadcast_message = GameMessage(
+                        type=MessageType.PLAYER_LEFT,
+                        timestamp=timestamp,
+                        data={"player_count": room.get_active_connection_count()}
+                    )
+                    await connection_manager.broadcast_to_room(room_id, broadcast_message)
 
-                # Broadcast updated game state
-                await connection_manager.broadcast_game_state(room_id)
+    except Exception as e:
+        await send_error(connection_id, "LEAVE_ROOM_ERROR", str(e))
 
 
-async def handle_player_input(connection_id: str, message: GameMessage):
+async def handle_player_input(connection_id: str, data: Dict[str, Any], timestamp: float):
     """Handle player input"""
     try:
-        input_data = PlayerInputData(**message.data)
+        input_data = msgspec.convert(data, PlayerInputData)
+
+        # Rate limit per connection; excess input is dropped silently
+        if not connection_manager.allow_input(connection_id):
+            logger.debug("🎮 Input rate limit hit for %s, dropping %s", connection_id, input_data.action)
+            return
 
         # Validate player is in a room
-        if connection_id not in connection_manager.connection_rooms:
+        room_id = connection_manager.get_room_id(connection_id)
+        if not room_id:
             await send_error(connection_id, "NOT_IN_ROOM", "Player not in a room")
             return
 
-        room_id = connection_manager.connection_rooms[connection_id]
-
         # Get game world and forward input
         world = world_manager.get_world(room_id)
         if world:
             # Debug: Check if the player_id from input matches connection_id
             if input_data.player_id != connection_id:
-                print(f"⚠️ Player ID mismatch! Input from: {input_data.player_id}, Connection: {connection_id}")
+                logger.warning("⚠️ Player ID mismatch! Input from: %s, Connection: %s", input_data.player_id, connection_id)
 
             # Use connection_id as player_id (matching what we used when adding player)
             world.handle_player_input(connection_id, input_data.action, input_data.pressed)
-            print(f"🎮 Input processed: {connection_id} -> {input_data.action} ({input_data.pressed})")
+            logger.debug("🎮 Input processed: %s -> %s (%s)", connection_id, input_data.action, input_data.pressed)
 
-            # Broadcast updated game state to all players in room
-            await connection_manager.broadcast_game_state(room_id)
+            # Don't broadcast here - the world update loop broadcasts every room at 30fps
         else:
             await send_error(connection_id, "WORLD_NOT_FOUND", "Game world not found for room")
 
@@ -364,61 +599,66 @@ async def handle_player_input(connection_id: str, message: GameMessage):
         await send_error(connection_id, "INPUT_ERROR", str(e))
 
 
-async def handle_ping(connection_id: str, message: GameMessage):
+async def handle_ping(connection_id: str, data: Dict[str, Any], timestamp: float):
     """Handle ping for connection health check"""
-    response = GameMessage(
-        type=MessageType.PONG,
-        timestamp=message.timestamp,
-        data={"server_time": asyncio.get_event_loop().time()}
-    )
-    await connection_manager.send_message(connection_id, response)
+    try:
+        response = GameMessage(
+            type=MessageType.PONG,
+            timestamp=timestamp,
+            data={"server_time": asyncio.get_running_loop().time()}
+        )
+        await connection_manager.send_message(connection_id, response)
+
+    except Exception as e:
+        await send_error(connection_id, "PING_ERROR", str(e))
 
 
-async def handle_game_state_update(connection_id: str, message: GameMessage):
+async def handle_game_state_update(connection_id: str, data: Dict[str, Any], timestamp: float):
     """Handle client game state update with conflict resolution"""
     try:
         # Validate player is in a room
-        if connection_id not in connection_manager.connection_rooms:
+        room_id = connection_manager.get_room_id(connection_id)
+        if not room_id:
             await send_error(connection_id, "NOT_IN_ROOM", "Player not in a room")
             return
-
-        room_id = connection_manager.connection_rooms[connection_id]
         world = world_manager.get_world(room_id)
         if not world:
             await send_error(connection_id, "WORLD_NOT_FOUND", "Game world not found for room")
             return
 
-        client_state = message.data
-        print(f"🔄 Processing game state update from {connection_id}")
+        # Validated in one pass; integral floats from JS are accepted for int fields
+        client_state = msgspec.convert(data, ClientStateUpdate, strict=False)
+        if (len(client_state.enemies) > MAX_STATE_UPDATE_ENTITIES
+                or len(client_state.projectiles) > MAX_STATE_UPDATE_ENTITIES):
+            await send_error(connection_id, "STATE_UPDATE_TOO_LARGE",
+                             f"At most {MAX_STATE_UPDATE_ENTITIES} enemies and projectiles per update")
+            return
+        logger.debug("🔄 Processing game state update from %s", connection_id)
 
         # Update player state (player always has authority over themselves)
-        if client_state.get('player'):
-            player_data = client_state['player']
-            if player_data['player_id'] == connection_id:
-                world.update_player_from_client(connection_id, player_data)
+        if client_state.player and client_state.player.player_id == connection_id:
+            world.update_player_from_client(connection_id, client_state.player)
 
         # Resolve enemy state conflicts using distance-based authority
-        if client_state.get('enemies'):
-            for enemy_data in client_state['enemies']:
-                enemy_id = enemy_data['enemy_id']
-                enemy_pos = (enemy_data['x'], enemy_data['y'])
+        if client_state.enemies:
+            # Checked once per update rather than inside logger.debug for every enemy
+            debug = logger.isEnabledFor(logging.DEBUG)
+            for enemy_update in client_state.enemies:
+                enemy_id = enemy_update.enemy_id
 
                 # Check if this client has authority over this enemy
                 if world.player_has_authority(connection_id, enemy_id):
-                    world.update_enemy_from_client(enemy_id, enemy_data)
-                    print(f"✅ {connection_id} has authority over {enemy_id}")
-                else:
-                    print(f"❌ {connection_id} denied authority over {enemy_id}")
+                    world.update_enemy_from_client(enemy_id, enemy_update)
+                    if debug:
+                        logger.debug("✅ %s has authority over %s", connection_id, enemy_id)
+                elif debug:
+                    logger.debug("❌ %s denied authority over %s", connection_id, enemy_id)
 
         # Resolve projectile state conflicts (owner always has authority)
-        if client_state.get('projectiles'):
-            for projectile_data in client_state['projectiles']:
-                projectile_id = projectile_data['projectile_id']
-                owner_id = projectile_data['owner_id']
-
-                # Only the owner can update their projectiles
-                if owner_id == connection_id:
-                    world.update_projectile_from_client(projectile_id, projectile_data)
+        for projectile_update in client_state.projectiles:
+            # Only the owner can update their projectiles
+            if projectile_update.owner_id == connection_id:
+                world.update_projectile_from_client(projectile_update.projectile_id, projectile_update)
 
         # Don't broadcast here - let the main update loop handle it at 30fps
 
@@ -426,46 +666,42 @@ async def handle_game_state_update(connection_id: str, message: GameMessage):
         await send_error(connection_id, "STATE_UPDATE_ERROR", str(e))
 
 
-async def handle_request_world_state(connection_id: str, message: GameMessage):
+async def handle_request_world_state(connection_id: str, data: Dict[str, Any], timestamp: float):
     """Handle client request for world state"""
     try:
         # Validate player is in a room
-        if connection_id not in connection_manager.connection_rooms:
+        room_id = connection_manager.get_room_id(connection_id)
+        if not room_id:
             await send_error(connection_id, "NOT_IN_ROOM", "Player not in a room")
             return
-
-        room_id = connection_manager.connection_rooms[connection_id]
         world = world_manager.get_world(room_id)
         if not world:
             await send_error(connection_id, "WORLD_NOT_FOUND", "Game world not found for room")
             return
 
         world_state = world.get_world_state()
-        response = GameMessage(
-            type=MessageType.WORLD_STATE,
-            timestamp=message.timestamp,
-            data=world_state.model_dump()
-        )
-        await connection_manager.send_message(connection_id, response)
-        print(f"🌍 Sent world state to {connection_id} for room {room_id}")
+        response = _envelope(MessageType.WORLD_STATE, timestamp, world_state)
+        connection_manager.send_raw(connection_id, response)
+        logger.debug("🌍 Sent world state to %s for room %s", connection_id, room_id)
 
     except Exception as e:
         await send_error(connection_id, "REQUEST_WORLD_STATE_ERROR", str(e))
 
 
-async def handle_ready_for_world(connection_id: str, message: GameMessage):
+async def handle_ready_for_world(connection_id: str, data: Dict[str, Any], timestamp: float):
     """Handle client ready for world state"""
     try:
         # Validate state transition
-        if not connection_manager.validate_state_transition(connection_id, ConnectionState.ROOM_JOINED):
-            await send_error(connection_id, "INVALID_STATE", f"Expected state ROOM_JOINED, got {connection_manager.get_connection_state(connection_id)}")
+        valid, current_state = connection_manager.validate_state_transition(connection_id, ConnectionState.ROOM_JOINED)
+        if not valid:
+            await send_error(connection_id, "INVALID_STATE", f"Expected state ROOM_JOINED, got {current_state}")
             return
 
-        ready_data = ReadyForWorldData(**message.data)
-        print(f"🌍 Backend: Client {connection_id} ready for world state")
+        ready_data = msgspec.convert(data, ReadyForWorldData)
+        logger.debug("🌍 Backend: Client %s ready for world state", connection_id)
 
         # Get room and world
-        room_id = connection_manager.connection_rooms.get(connection_id)
+        room_id = connection_manager.get_room_id(connection_id)
         if not room_id or room_id != ready_data.room_id:
             await send_error(connection_id, "ROOM_MISMATCH", "Room ID doesn't match")
             return
@@ -477,35 +713,36 @@ async def handle_ready_for_world(connection_id: str, message: GameMessage):
 
         # Send world state
         world_state = world.get_world_state()
-        world_message = GameMessage(
-            type=MessageType.WORLD_STATE,
-            timestamp=message.timestamp,
-            connection_state=ConnectionState.WORLD_SENT,
-            data=world_state.model_dump()
+        world_message = _envelope(
+            MessageType.WORLD_STATE,
+            timestamp,
+            world_state,
+            ConnectionState.WORLD_SENT
         )
-        await connection_manager.send_message(connection_id, world_message)
+        connection_manager.send_raw(connection_id, world_message)
         
         # Update connection state
         connection_manager.set_connection_state(connection_id, ConnectionState.WORLD_SENT)
-        print(f"🌍 Sent world state to {connection_id}: {len(world_state.platforms)} platforms, seed {world_state.world_seed}")
+        logger.debug("🌍 Sent world state to %s: %d platforms, seed %s", connection_id, len(world_state.platforms), world_state.world_seed)
 
     except Exception as e:
         await send_error(connection_id, "READY_FOR_WORLD_ERROR", str(e))
 
 
-async def handle_world_ready(connection_id: str, message: GameMessage):
+async def handle_world_ready(connection_id: str, data: Dict[str, Any], timestamp: float):
     """Handle client acknowledgment of world state received"""
     try:
         # Validate state transition
-        if not connection_manager.validate_state_transition(connection_id, ConnectionState.WORLD_SENT):
-            await send_error(connection_id, "INVALID_STATE", f"Expected state WORLD_SENT, got {connection_manager.get_connection_state(connection_id)}")
+        valid, current_state = connection_manager.validate_state_transition(connection_id, ConnectionState.WORLD_SENT)
+        if not valid:
+            await send_error(connection_id, "INVALID_STATE", f"Expected state WORLD_SENT, got {current_state}")
             return
 
-        world_ready_data = WorldReadyData(**message.data)
-        print(f"🌍 Backend: Client {connection_id} confirmed world state received (seed: {world_ready_data.world_seed})")
+        world_ready_data = msgspec.convert(data, WorldReadyData)
+        logger.debug("🌍 Backend: Client %s confirmed world state received (seed: %s)", connection_id, world_ready_data.world_seed)
 
         # Get room and world
-        room_id = connection_manager.connection_rooms.get(connection_id)
+        room_id = connection_manager.get_room_id(connection_id)
         if not room_id or room_id != world_ready_data.room_id:
             await send_error(connection_id, "ROOM_MISMATCH", "Room ID doesn't match")
             return
@@ -520,34 +757,34 @@ async def handle_world_ready(connection_id: str, message: GameMessage):
             await send_error(connection_id, "WORLD_SEED_MISMATCH", f"Expected seed {world.world_seed}, got {world_ready_data.world_seed}")
             return
 
-        # Send initial game state
-        initial_state = world.get_game_state()
-        state_message = GameMessage(
-            type=MessageType.GAME_STATE,
-            timestamp=message.timestamp,
-            connection_state=ConnectionState.GAME_READY,
-            data=initial_state.model_dump()
+        # Send initial game state, reusing the entity JSON of this state version
+        state_message = _envelope(
+            MessageType.GAME_STATE,
+            timestamp,
+            _game_state_data(room_id, world.tick, world.get_entity_json()),
+            ConnectionState.GAME_READY
         )
-        await connection_manager.send_message(connection_id, state_message)
+        connection_manager.send_raw(connection_id, state_message)
         
         # Update connection state
         connection_manager.set_connection_state(connection_id, ConnectionState.GAME_READY)
-        print(f"🌍 Sent initial game state to {connection_id}: {len(initial_state.enemies)} enemies, {len(initial_state.projectiles)} projectiles")
+        logger.debug("🌍 Sent initial game state to %s: %d enemies, %d projectiles", connection_id, len(world.enemies), len(world.projectiles))
 
     except Exception as e:
         await send_error(connection_id, "WORLD_READY_ERROR", str(e))
 
 
-async def handle_client_ready(connection_id: str, message: GameMessage):
+async def handle_client_ready(connection_id: str, data: Dict[str, Any], timestamp: float):
     """Handle client acknowledgment that initialization is complete"""
     try:
         # Validate state transition
-        if not connection_manager.validate_state_transition(connection_id, ConnectionState.GAME_READY):
-            await send_error(connection_id, "INVALID_STATE", f"Expected state GAME_READY, got {connection_manager.get_connection_state(connection_id)}")
+        valid, current_state = connection_manager.validate_state_transition(connection_id, ConnectionState.GAME_READY)
+        if not valid:
+            await send_error(connection_id, "INVALID_STATE", f"Expected state GAME_READY, got {current_state}")
             return
 
-        client_ready_data = ClientReadyData(**message.data)
-        print(f"🎮 Backend: Client {connection_id} initialization complete and ready for gameplay")
+        client_ready_data = msgspec.convert(data, ClientReadyData)
+        logger.info("🎮 Backend: Client %s initialization complete and ready for gameplay", connection_id)
 
         # Client is now fully ready for gameplay - no state change needed, GAME_READY is final state
         # From this point on, normal game state updates can proceed
@@ -556,14 +793,28 @@ async def handle_client_ready(connection_id: str, message: GameMessage):
         await send_error(connection_id, "CLIENT_READY_ERROR", str(e))
 
 
+# Inbound message handlers, keyed by the plain string value of the message type
+MESSAGE_HANDLERS: Dict[str, Callable[[str, Dict[str, Any], float], Awaitable[None]]] = {
+    MessageType.JOIN_ROOM.value: handle_join_room,
+    MessageType.LEAVE_ROOM.value: handle_leave_room,
+    MessageType.PLAYER_INPUT.value: handle_player_input,
+    MessageType.PING.value: handle_ping,
+    MessageType.GAME_STATE_UPDATE.value: handle_game_state_update,
+    MessageType.REQUEST_WORLD_STATE.value: handle_request_world_state,
+    MessageType.READY_FOR_WORLD.value: handle_ready_for_world,
+    MessageType.WORLD_READY.value: handle_world_ready,
+    MessageType.CLIENT_READY.value: handle_client_ready,
+}
+
+
 async def send_error(connection_id: str, error_code: str, error_message: str):
     """Send error message to client"""
-    error_msg = GameMessage(
-        type=MessageType.ERROR,
-        timestamp=asyncio.get_event_loop().time(),
-        data={
+    error_msg = _envelope(
+        MessageType.ERROR,
+        asyncio.get_running_loop().time(),
+        {
             "error_code": error_code,
             "message": error_message
         }
     )
-    await connection_manager.send_message(connection_id, error_msg)
+    connection_manager.send_raw(connection_id, error_msg)
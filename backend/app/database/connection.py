@@ -24,12 +24,19 @@ def init_database():
         echo=settings.debug,  # Log SQL queries in debug mode
         pool_pre_ping=True,  # Validate connections before use
         pool_recycle=300,    # Recycle connections every 5 minutes
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_use_lifo=True,  # Hand out the most recently used connection, keeps the hot set small
+        insertmanyvalues_page_size=10000,  # Rows per multi-row INSERT for bulk inserts
     )
 
     # Create session factory
     SessionLocal = sessionmaker(
         autocommit=False,
         autoflush=False,
+        # Keep loaded attributes after commit: created rows already carry their server
+        # defaults from INSERT ... RETURNING, and callers use them after the session closes
+        expire_on_commit=False,
         bind=engine
     )
 
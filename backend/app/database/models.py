@@ -5,7 +5,7 @@ from datetime import datetime
 from uuid import uuid4, UUID
 from typing import Optional
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, UUID as SqlUUID
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index, text, UUID as SqlUUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -16,6 +16,10 @@ Base = declarative_base()
 class GameRoom(Base):
     """Game room model"""
     __tablename__ = "game_rooms"
+    __table_args__ = (
+        # get_room_by_name() only looks at active rooms
+        Index("ix_game_rooms_active_name", "name", postgresql_where=text("is_active")),
+    )
 
     id = Column(SqlUUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
@@ -54,6 +58,11 @@ class Player(Base):
 class GameSession(Base):
     """Game session model - represents a player's participation in a room"""
     __tablename__ = "game_sessions"
+    __table_args__ = (
+        # Active session lookups filter on left_at IS NULL
+        Index("ix_game_sessions_active_room", "room_id", postgresql_where=text("left_at IS NULL")),
+        Index("ix_game_sessions_active_player", "player_id", postgresql_where=text("left_at IS NULL")),
+    )
 
     id = Column(SqlUUID(as_uuid=True), primary_key=True, default=uuid4)
     room_id = Column(SqlUUID(as_uuid=True), ForeignKey("game_rooms.id", ondelete="CASCADE"), nullable=False)
@@ -80,6 +89,9 @@ class GameSession(Base):
 class GameStat(Base):
     """Game statistics model"""
     __tablename__ = "game_stats"
+    __table_args__ = (
+        Index("ix_game_stats_player_type_time", "player_id", "stat_type", "recorded_at"),
+    )
 
     id = Column(SqlUUID(as_uuid=True), primary_key=True, default=uuid4)
     player_id = Column(SqlUUID(as_uuid=True), ForeignKey("players.id", ondelete="CASCADE"), nullable=False)
@@ -1,13 +1,15 @@
 """
 Database repository layer for game entities
 """
+from contextlib import contextmanager
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, timedelta
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload, raiseload
+from sqlalchemy import and_, exists, insert, update
 
+from app.config.settings import settings
 from app.database.models import GameRoom, Player, GameSession, GameStat
 from app.database.connection import get_db_session
 
@@ -18,6 +20,7 @@ class GameRepository:
     def __init__(self, db: Session = None):
         self.db = db or get_db_session()
         self._should_close = db is None
+        self._batch_depth = 0  # > 0 while inside batch(), writes are flushed but not committed
 
     def __enter__(self):
         return self
@@ -26,13 +29,39 @@ class GameRepository:
         if self._should_close:
             self.db.close()
 
+    # Unit of work
+    @contextmanager
+    def batch(self):
+        """Group writes into a single transaction, committed once when the block exits"""
+        self._batch_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.db.rollback()
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush_and_commit()
+
+    def flush_and_commit(self):
+        """Commit all pending writes"""
+        self.db.commit()
+
+    def _commit(self):
+        """Commit now, or only flush (so generated values are available) inside batch()"""
+        if self._batch_depth:
+            self.db.flush()
+        else:
+            self.db.commit()
+
     # Room operations
     def create_room(self, name: str, max_players: int = 4) -> GameRoom:
         """Create a new game room"""
         room = GameRoom(name=name, max_players=max_players)
         self.db.add(room)
-        self.db.commit()
-        self.db.refresh(room)
+        self._commit()
         return room
 
     def get_room_by_id(self, room_id: UUID) -> Optional[GameRoom]:
@@ -51,21 +80,20 @@ class GameRepository:
 
     def deactivate_room(self, room_id: UUID) -> bool:
         """Deactivate a room"""
-        room = self.get_room_by_id(room_id)
-        if room:
-            room.is_active = False
-            room.updated_at = datetime.utcnow()
-            self.db.commit()
-            return True
-        return False
+        result = self.db.execute(
+            update(GameRoom)
+            .where(GameRoom.id == room_id)
+            .values(is_active=False, updated_at=datetime.utcnow())
+        )
+        self._commit()
+        return result.rowcount > 0
 
     # Player operations
     def create_player(self, username: str, session_id: str = None) -> Player:
         """Create a new player"""
         player = Player(username=username, session_id=session_id)
         self.db.add(player)
-        self.db.commit()
-        self.db.refresh(player)
+        self._commit()
         return player
 
     def get_player_by_id(self, player_id: UUID) -> Optional[Player]:
@@ -82,18 +110,19 @@ class GameRepository:
 
     def update_player_last_seen(self, player_id: UUID):
         """Update player's last seen timestamp"""
-        player = self.get_player_by_id(player_id)
-        if player:
-            player.last_seen = datetime.utcnow()
-            self.db.commit()
+        self.db.execute(
+            update(Player).where(Player.id == player_id).values(last_seen=datetime.utcnow())
+        )
+        self._commit()
 
     def update_player_session(self, player_id: UUID, session_id: str):
         """Update player's session ID"""
-        player = self.get_player_by_id(player_id)
-        if player:
-            player.session_id = session_id
-            player.last_seen = datetime.utcnow()
-            self.db.commit()
+        self.db.execute(
+            update(Player)
+            .where(Player.id == player_id)
+            .values(session_id=session_id, last_seen=datetime.utcnow())
+        )
+        self._commit()
 
     # Game session operations
     def create_game_session(self, room_id: UUID, player_id: UUID, character_type: str = "hero1") -> GameSession:
@@ -104,8 +133,7 @@ class GameRepository:
             character_type=character_type
         )
         self.db.add(session)
-        self.db.commit()
-        self.db.refresh(session)
+        self._commit()
         return session
 
     def get_game_session_by_id(self, session_id: UUID) -> Optional[GameSession]:
@@ -113,8 +141,11 @@ class GameRepository:
         return self.db.query(GameSession).filter(GameSession.id == session_id).first()
 
     def get_active_sessions_for_room(self, room_id: UUID) -> List[GameSession]:
-        """Get all active sessions for a room"""
-        return self.db.query(GameSession).filter(
+        """Get all active sessions for a room, with their players loaded in one extra query"""
+        options = [selectinload(GameSession.player)]
+        if settings.debug:
+            options.append(raiseload("*"))  # Surface any other lazy load as an error while developing
+        return self.db.query(GameSession).options(*options).filter(
             and_(GameSession.room_id == room_id, GameSession.left_at.is_(None))
         ).all()
 
@@ -126,21 +157,23 @@ class GameRepository:
 
     def end_game_session(self, session_id: UUID, final_score: int = None) -> bool:
         """End a game session"""
-        session = self.get_game_session_by_id(session_id)
-        if session and session.is_active:
-            session.left_at = datetime.utcnow()
-            if final_score is not None:
-                session.score = final_score
-            self.db.commit()
-            return True
-        return False
+        values = {"left_at": datetime.utcnow()}
+        if final_score is not None:
+            values["score"] = final_score
+        result = self.db.execute(
+            update(GameSession)
+            .where(and_(GameSession.id == session_id, GameSession.left_at.is_(None)))
+            .values(**values)
+        )
+        self._commit()
+        return result.rowcount > 0
 
     def update_session_score(self, session_id: UUID, score: int):
         """Update session score"""
-        session = self.get_game_session_by_id(session_id)
-        if session:
-            session.score = score
-            self.db.commit()
+        self.db.execute(
+            update(GameSession).where(GameSession.id == session_id).values(score=score)
+        )
+        self._commit()
 
     # Game statistics operations
     def record_stat(self, player_id: UUID, session_id: UUID, stat_type: str, stat_value: int) -> GameStat:
@@ -152,57 +185,57 @@ class GameRepository:
             stat_value=stat_value
         )
         self.db.add(stat)
-        self.db.commit()
-        self.db.refresh(stat)
+        self._commit()
         return stat
 
+    def record_stats(self, stats: List[GameStat]):
+        """Record several game statistics in one commit"""
+        self.db.add_all(stats)
+        self._commit()
+
+    def record_stats_bulk(self, rows: List[dict]):
+        """Record game statistics from plain dicts as one multi-row INSERT, skipping ORM object bookkeeping"""
+        if rows:
+            self.db.execute(insert(GameStat), rows)
+        self._commit()
+
     def get_player_stats(self, player_id: UUID, stat_type: str = None) -> List[GameStat]:
         """Get player statistics"""
-        query = self.db.query(GameStat).filter(GameStat.player_id == player_id)
+        query = self.db.query(GameStat).options(raiseload("*")).filter(GameStat.player_id == player_id)
         if stat_type:
             query = query.filter(GameStat.stat_type == stat_type)
         return query.order_by(GameStat.recorded_at.desc()).all()
 
     # Cleanup operations
     def cleanup_old_sessions(self, hours_ago: int = 24) -> int:
-        """Clean up old inactive sessions"""
+        """Mark sessions that were never ended and started more than X hours ago as ended"""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours_ago)
 
-        # Find sessions that are either:
-        # - Explicitly ended more than X hours ago
-        # - Never ended but created more than X hours ago
-        old_sessions = self.db.query(GameSession).filter(
-            or_(
-                and_(GameSession.left_at.isnot(None), GameSession.left_at < cutoff_time),
-                and_(GameSession.left_at.is_(None), GameSession.joined_at < cutoff_time)
-            )
-        ).all()
-
-        count = len(old_sessions)
-        for session in old_sessions:
-            if session.left_at is None:
-                session.left_at = session.joined_at  # Mark as ended
-
-        self.db.commit()
-        return count
+        result = self.db.execute(
+            update(GameSession)
+            .where(and_(GameSession.left_at.is_(None), GameSession.joined_at < cutoff_time))
+            .values(left_at=GameSession.joined_at)
+            .execution_options(synchronize_session=False)
+        )
+        self._commit()
+        return result.rowcount
 
     def cleanup_inactive_rooms(self, hours_ago: int = 48) -> int:
-        """Clean up rooms with no recent activity"""
+        """Clean up rooms with no active sessions and no recent activity"""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours_ago)
 
-        # Find rooms with no active sessions and no recent activity
-        inactive_rooms = self.db.query(GameRoom).filter(
-            and_(
+        has_active_session = exists().where(
+            and_(GameSession.room_id == GameRoom.id, GameSession.left_at.is_(None))
+        )
+        result = self.db.execute(
+            update(GameRoom)
+            .where(and_(
                 GameRoom.is_active == True,
                 GameRoom.updated_at < cutoff_time,
-                ~GameRoom.game_sessions.any(GameSession.left_at.is_(None))
-            )
-        ).all()
-
-        count = len(inactive_rooms)
-        for room in inactive_rooms:
-            room.is_active = False
-            room.updated_at = datetime.utcnow()
-
-        self.db.commit()
-        return count
+                ~has_active_session
+            ))
+            .values(is_active=False, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        self._commit()
+        return result.rowcount
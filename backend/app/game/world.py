@@ -2,19 +2,68 @@
 Game world simulation for server-side multiplayer logic
 """
 import asyncio
+import logging
 import time
 import random
+from itertools import count
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from uuid import uuid4
-from random import choice
 
-from app.network.protocol import PlayerState, EnemyState, ProjectileState, GameStateData, InputAction, WorldStateData, PlatformState
+import msgspec
+
+from app.network.protocol import (
+    PlayerState, EnemyState, ProjectileState, InputAction, WorldStateData, PlatformState,
+    ClientPlayerUpdate, ClientEnemyUpdate, ClientProjectileUpdate
+)
+
+logger = logging.getLogger(__name__)
+
+_entity_encoder = msgspec.json.Encoder()
+
+# Shared across worlds so a version never repeats, even for a recreated room
+_state_versions = count(1)
+
+TICK_INTERVAL = 1 / 60  # Fixed simulation step, 60 FPS (16.67ms per frame)
+TICK_INTERVAL_NS = 1_000_000_000 // 60
+BROADCAST_INTERVAL_NS = 1_000_000_000 // 30  # 30fps server broadcasts
+MAX_CATCH_UP_TICKS = 3  # Missed ticks run back to back before the schedule is reset
+IDLE_INTERVAL = 0.25  # Poll interval while there are no worlds to update
+
+AUTHORITY_INTERVAL_TICKS = 10  # Ticks between re-resolving enemy authority
+ENEMY_DIRECTION_INTERVAL_TICKS = 120  # Change direction every 2 seconds (at 60fps)
+ADVENTURER_SPEEDS = (-50, 0, 50)  # Adventurer (boss) moves slower
+SLIME_SPEEDS = (-100, -50, 0, 50, 100)  # Slime (regular enemies) move faster
+
+# Held inputs are stored per player as a bitmask of these flags
+INPUT_MOVE_LEFT = 1 << 0
+INPUT_MOVE_RIGHT = 1 << 1
+INPUT_JUMP = 1 << 2
+INPUT_SHOOT = 1 << 3
+INPUT_STOP_MOVE = 1 << 4
+INPUT_BITS: Dict[InputAction, int] = {
+    InputAction.MOVE_LEFT: INPUT_MOVE_LEFT,
+    InputAction.MOVE_RIGHT: INPUT_MOVE_RIGHT,
+    InputAction.JUMP: INPUT_JUMP,
+    InputAction.SHOOT: INPUT_SHOOT,
+    InputAction.STOP_MOVE: INPUT_STOP_MOVE,
+}
+
+
+def _apply_client_fields(target, update, id_field: str):
+    """Copy the fields a client sent (not None) from a client update struct onto a state model"""
+    for field in update.__struct_fields__:
+        if field != id_field:
+            value = getattr(update, field)
+            if value is not None:
+                setattr(target, field, value)
 
 
 class Platform:
     """Platform state for synchronization"""
 
+    # A world holds ~100 platforms and the moving ones are updated every tick
+    __slots__ = ("platform_id", "x", "y", "width", "height", "platform_type", "moving_data")
+
     def __init__(self, platform_id: str, x: float, y: float, width: float, height: float, platform_type: str = "static"):
         self.platform_id = platform_id
         self.x = x
@@ -49,6 +98,7 @@ class GameWorld:
         self.enemies: Dict[str, EnemyState] = {}
         self.projectiles: Dict[str, ProjectileState] = {}
         self.platforms: Dict[str, Platform] = {}
+        self.moving_platforms: List[Platform] = []  # Subset of platforms updated every tick
 
         # Game constants (synced with client)
         self.world_width = 12000
@@ -62,7 +112,10 @@ class GameWorld:
         self.jump_speed = 550
 
         # Input tracking
-        self.player_inputs: Dict[str, Dict[str, bool]] = {}  # player_id -> {action: pressed}
+        self.player_inputs: Dict[str, int] = {}  # player_id -> bitmask of held INPUT_* flags
+
+        # Server-side projectile ids, only unique within this world
+        self._projectile_ids = count(1)
 
         # Authority tracking for conflict resolution
         self.object_authorities: Dict[str, str] = {}  # object_id -> player_id
@@ -74,9 +127,26 @@ class GameWorld:
         # Initialize world when created
         self.generate_world()
 
+        # Platform states for world state messages, built once; only the moving ones are
+        # patched when a world state is requested
+        self._platform_states = [PlatformState(**platform.to_dict()) for platform in self.platforms.values()]
+        self._moving_platform_states = [
+            (platform, state) for platform, state in zip(self.platforms.values(), self._platform_states)
+            if platform.platform_type == "moving"
+        ]
+
+        # Bumped on every mutation so unchanged state is not re-broadcast
+        self.state_version = next(_state_versions)
+        self._entity_json: Optional[Dict[str, Dict[str, bytes]]] = None
+        self._entity_json_version = 0
+
+    def mark_dirty(self):
+        """Record that the game state changed since the last broadcast"""
+        self.state_version = next(_state_versions)
+
     def generate_world(self):
         """Generate consistent world layout for all clients"""
-        print(f"🌍 Generating world for room {self.room_id} with seed {self.world_seed}")
+        logger.debug("🌍 Generating world for room %s with seed %s", self.room_id, self.world_seed)
 
         # Generate ground platforms
         self.generate_ground_platforms()
@@ -90,7 +160,8 @@ class GameWorld:
         # Generate enemies
         self.create_enemies()
 
-        print(f"🌍 World generation complete: {len(self.platforms)} platforms, {len(self.enemies)} enemies")
+        logger.info("🌍 World generation complete for room %s: %d platforms, %d enemies",
+                    self.room_id, len(self.platforms), len(self.enemies))
 
     def generate_ground_platforms(self):
         """Generate ground platforms that span the entire world"""
@@ -185,6 +256,7 @@ class GameWorld:
                 "direction": -1
             }
             self.platforms[platform_id] = platform
+            self.moving_platforms.append(platform)
             platform_id_counter += 1
 
     def add_player(self, player_id: str, username: str, x: float = 100, y: float = 650) -> PlayerState:
@@ -205,7 +277,8 @@ class GameWorld:
         )
 
         self.players[player_id] = player_state
-        self.player_inputs[player_id] = {}
+        self.player_inputs[player_id] = 0
+        self.mark_dirty()
 
         return player_state
 
@@ -215,16 +288,30 @@ class GameWorld:
             del self.players[player_id]
             if player_id in self.player_inputs:
                 del self.player_inputs[player_id]
+            # Objects the player had authority over are re-resolved on the next tick
+            self.object_authorities = {
+                object_id: authority for object_id, authority in self.object_authorities.items()
+                if authority != player_id
+            }
+            self.mark_dirty()
             return True
         return False
 
     def handle_player_input(self, player_id: str, action: InputAction, pressed: bool):
-        """Process player input"""
-        if player_id not in self.player_inputs:
-            self.player_inputs[player_id] = {}
+        """Process player input
+
+        Inputs are only recorded here and applied by the next update(); a repeated
+        key state (held-key auto-repeat) is dropped. Shooting fires on every press.
+        """
+        bit = INPUT_BITS[action]
+        inputs = self.player_inputs.get(player_id, 0)
+        new_inputs = inputs | bit if pressed else inputs & ~bit
+        if new_inputs == inputs and action != InputAction.SHOOT and player_id in self.player_inputs:
+            return
 
-        self.player_inputs[player_id][action] = pressed
-        print(f"🎮 World {self.room_id}: Player {player_id} input {action}={pressed}")
+        self.player_inputs[player_id] = new_inputs
+        self.mark_dirty()
+        logger.debug("🎮 World %s: Player %s input %s=%s", self.room_id, player_id, action, pressed)
 
         # Immediately handle shooting to be responsive
         if action == InputAction.SHOOT and pressed:
@@ -233,65 +320,86 @@ class GameWorld:
     def update(self, delta_time: float):
         """Update game world simulation"""
         self.tick += 1
+        # Only entity changes bump the state version, so an idle world is not re-broadcast
+        changed = False
 
         # Update players
         for player_id, player in self.players.items():
-            self.update_player(player, delta_time)
+            changed |= self.update_player(player, delta_time)
 
         # Update enemies
+        if self.tick % ENEMY_DIRECTION_INTERVAL_TICKS == 0:
+            self.change_enemy_directions()
+            changed = True
         for enemy_id, enemy in self.enemies.items():
-            self.update_enemy(enemy, delta_time)
-
-        # Update projectiles
-        projectiles_to_remove = []
-        for proj_id, projectile in self.projectiles.items():
-            self.update_projectile(projectile, delta_time)
-
-            # Remove projectiles that are off-screen or expired
-            if (projectile.x < -50 or projectile.x > self.world_width + 50 or
-                    projectile.y > self.world_height + 50):
-                projectiles_to_remove.append(proj_id)
+            changed |= self.update_enemy(enemy, delta_time)
+
+        # Update projectiles, integrated inline with bounds and per-tick constants hoisted
+        # out of the loop since this runs for every projectile every tick
+        if self.projectiles:
+            projectile_gravity = 200 * delta_time  # Slight gravity on projectiles
+            min_x = -50
+            max_x = self.world_width + 50
+            max_y = self.world_height + 50
+
+            # Integrate and filter in one pass, rebuilding the dict with the projectiles still in play
+            remaining = {}
+            for proj_id, projectile in self.projectiles.items():
+                x = projectile.x + projectile.velocity_x * delta_time
+                y = projectile.y + projectile.velocity_y * delta_time
+                projectile.x = x
+                projectile.y = y
+                projectile.velocity_y += projectile_gravity
+
+                # Drop projectiles that are off-screen or expired, along with their authority
+                if min_x <= x <= max_x and y <= max_y:
+                    remaining[proj_id] = projectile
+                else:
+                    self.object_authorities.pop(proj_id, None)
+            self.projectiles = remaining
+            changed = True
 
-        for proj_id in projectiles_to_remove:
-            del self.projectiles[proj_id]
+        if changed:
+            self.mark_dirty()
 
         # Update moving platforms
         self.update_moving_platforms(delta_time)
 
     def update_moving_platforms(self, delta_time: float):
         """Update moving platform positions"""
-        for platform_id, platform in self.platforms.items():
-            if platform.platform_type == "moving" and platform.moving_data:
-                min_y = platform.moving_data["min_y"]
-                max_y = platform.moving_data["max_y"]
-                speed = platform.moving_data["speed"]
-                direction = platform.moving_data["direction"]
-
-                # Update position
-                platform.y += speed * direction * delta_time
-
-                # Change direction at boundaries
-                if platform.y <= min_y and direction == -1:
-                    platform.moving_data["direction"] = 1
-                elif platform.y >= max_y and direction == 1:
-                    platform.moving_data["direction"] = -1
-
-    def update_player(self, player: PlayerState, delta_time: float):
-        """Update single player state"""
-        inputs = self.player_inputs.get(player.player_id, {})
+        # Only the moving platforms, not a scan over every platform in the world
+        for platform in self.moving_platforms:
+            moving_data = platform.moving_data
+            direction = moving_data["direction"]
+
+            # Update position
+            y = platform.y + moving_data["speed"] * direction * delta_time
+            platform.y = y
+
+            # Change direction at boundaries
+            if y <= moving_data["min_y"] and direction == -1:
+                moving_data["direction"] = 1
+            elif y >= moving_data["max_y"] and direction == 1:
+                moving_data["direction"] = -1
+
+    def update_player(self, player: PlayerState, delta_time: float) -> bool:
+        """Update single player state, returning whether it changed"""
+        before = (player.x, player.y, player.velocity_x, player.velocity_y,
+                  player.facing_right, player.is_grounded, player.is_jumping)
+        inputs = self.player_inputs.get(player.player_id, 0)
 
         # Movement
-        if inputs.get(InputAction.MOVE_LEFT, False):
+        if inputs & INPUT_MOVE_LEFT:
             player.velocity_x = -self.player_speed
             player.facing_right = False
-        elif inputs.get(InputAction.MOVE_RIGHT, False):
+        elif inputs & INPUT_MOVE_RIGHT:
             player.velocity_x = self.player_speed
             player.facing_right = True
         else:
             player.velocity_x = 0
 
         # Jumping
-        if inputs.get(InputAction.JUMP, False) and player.is_grounded:
+        if inputs & INPUT_JUMP and player.is_grounded:
             player.velocity_y = -self.jump_speed
             player.is_grounded = False
             player.is_jumping = True
@@ -300,27 +408,21 @@ class GameWorld:
         if not player.is_grounded:
             player.velocity_y += self.gravity * delta_time
 
-        # Update position
-        player.x += player.velocity_x * delta_time
-        player.y += player.velocity_y * delta_time
+        # Update position, clamped to the world boundaries and the ground so each
+        # coordinate is assigned once per tick
+        ground_y = self.ground_y
+        y = player.y + player.velocity_y * delta_time
+        player.x = max(16, min(self.world_width - 16, player.x + player.velocity_x * delta_time))
+        player.y = min(y, ground_y)
 
         # Ground collision
-        if player.y >= self.ground_y:
-            player.y = self.ground_y
+        if y >= ground_y:
             player.velocity_y = 0
             player.is_grounded = True
             player.is_jumping = False
 
-        # World boundaries
-        player.x = max(16, min(self.world_width - 16, player.x))
-
-    def update_projectile(self, projectile: ProjectileState, delta_time: float):
-        """Update projectile position"""
-        projectile.x += projectile.velocity_x * delta_time
-        projectile.y += projectile.velocity_y * delta_time
-
-        # Apply slight gravity to projectiles
-        projectile.velocity_y += 200 * delta_time
+        return before != (player.x, player.y, player.velocity_x, player.velocity_y,
+                          player.facing_right, player.is_grounded, player.is_jumping)
 
     def create_projectile(self, player_id: str) -> Optional[str]:
         """Create a projectile from player"""
@@ -330,15 +432,15 @@ class GameWorld:
         player = self.players[player_id]
 
         # Create projectile
-        projectile_id = str(uuid4())
+        projectile_id = f"projectile_{next(self._projectile_ids)}"
         direction = 1 if player.facing_right else -1
 
         projectile = ProjectileState(
             projectile_id=projectile_id,
             x=player.x,
             y=player.y,
-            velocity_x=direction * 400,
-            velocity_y=-50,
+            velocity_x=direction * 400.0,
+            velocity_y=-50.0,
             owner_id=player_id,
             damage=25
         )
@@ -346,7 +448,7 @@ class GameWorld:
         self.projectiles[projectile_id] = projectile
         # Set authority to the player who shot the projectile
         self.object_authorities[projectile_id] = player_id
-        print(f"🎯 Created projectile {projectile_id} with authority to {player_id}")
+        logger.debug("🎯 Created projectile %s with authority to %s", projectile_id, player_id)
         return projectile_id
 
     def create_enemies(self):
@@ -383,71 +485,86 @@ class GameWorld:
             self.enemies[enemy_id] = enemy
             # Initialize authority based on closest player (if any)
             self.update_object_authority(enemy_id, x, y)
-            print(f"🦴 Created enemy: {enemy_id} ({enemy_type}) at ({x}, {y})")
+            logger.debug("🦴 Created enemy: %s (%s) at (%s, %s)", enemy_id, enemy_type, x, y)
 
-    def update_enemy(self, enemy: EnemyState, delta_time: float):
-        """Update single enemy state - only if we have authority"""
-        # Update authority for this enemy
-        self.update_object_authority(enemy.enemy_id, enemy.x, enemy.y)
+    def update_enemy(self, enemy: EnemyState, delta_time: float) -> bool:
+        """Update single enemy state - only if we have authority; returns whether it changed"""
+        # Update authority for this enemy; positions change slowly relative to the tick rate,
+        # so it is only re-resolved every few ticks, or right away when the enemy has none
+        if self.tick % AUTHORITY_INTERVAL_TICKS == 0 or enemy.enemy_id not in self.object_authorities:
+            self.update_object_authority(enemy.enemy_id, enemy.x, enemy.y)
 
         # Only update enemy AI if we have authority (closest player controls it)
-        authority_player = self.get_object_authority(enemy.enemy_id)
+        authority_player = self.object_authorities.get(enemy.enemy_id)
         if not authority_player:
-            return  # No players, no updates
-
-        # Simple AI: Random movement with occasional direction changes
-        if self.tick % 120 == 0:  # Change direction every 2 seconds (at 60fps)
-            # Random chance to change direction or speed
-            if enemy.enemy_type == "adventurer":
-                # Adventurer (boss) moves slower
-                enemy.velocity_x = choice([-50, 0, 50])
-            else:
-                # Slime (regular enemies) move faster
-                enemy.velocity_x = choice([-100, -50, 0, 50, 100])
+            return False  # No players, no updates
 
-            enemy.facing_right = enemy.velocity_x >= 0
+        before = (enemy.x, enemy.y, enemy.velocity_x, enemy.velocity_y, enemy.facing_right)
 
         # Apply gravity
         enemy.velocity_y += self.gravity * delta_time
 
-        # Update position
-        enemy.x += enemy.velocity_x * delta_time
-        enemy.y += enemy.velocity_y * delta_time
+        # Update position, clamped to the world boundaries and the ground so each
+        # coordinate is assigned once per tick
+        ground_y = self.ground_y
+        max_x = self.world_width - 16
+        x = enemy.x + enemy.velocity_x * delta_time
+        y = enemy.y + enemy.velocity_y * delta_time
+        enemy.x = max(16, min(max_x, x))
+        enemy.y = min(y, ground_y)
 
         # Ground collision
-        if enemy.y >= self.ground_y:
-            enemy.y = self.ground_y
+        if y >= ground_y:
             enemy.velocity_y = 0
 
         # World boundaries (bounce off walls)
-        if enemy.x <= 16:
-            enemy.x = 16
+        if x <= 16:
             enemy.velocity_x = abs(enemy.velocity_x)  # Bounce right
             enemy.facing_right = True
-        elif enemy.x >= self.world_width - 16:
-            enemy.x = self.world_width - 16
+        elif x >= max_x:
             enemy.velocity_x = -abs(enemy.velocity_x)  # Bounce left
             enemy.facing_right = False
 
-    def get_game_state(self) -> GameStateData:
-        """Get current game state"""
-        return GameStateData(
-            room_id=self.room_id,
-            tick=self.tick,
-            players=list(self.players.values()),
-            enemies=list(self.enemies.values()),
-            projectiles=list(self.projectiles.values())
-        )
+        return before != (enemy.x, enemy.y, enemy.velocity_x, enemy.velocity_y, enemy.facing_right)
+
+    def change_enemy_directions(self):
+        """Simple AI: random movement, new speeds for all enemies drawn with one call per enemy type"""
+        adventurers = [enemy for enemy in self.enemies.values() if enemy.enemy_type == "adventurer"]
+        slimes = [enemy for enemy in self.enemies.values() if enemy.enemy_type != "adventurer"]
+        for enemies, speeds in ((adventurers, ADVENTURER_SPEEDS), (slimes, SLIME_SPEEDS)):
+            for enemy, velocity_x in zip(enemies, random.choices(speeds, k=len(enemies))):
+                enemy.velocity_x = velocity_x
+                enemy.facing_right = velocity_x >= 0
+
+    def get_entity_json(self) -> Dict[str, Dict[str, bytes]]:
+        """Get players, enemies and projectiles serialized to JSON by id, cached until the next mutation
+
+        Callers share the returned dicts and must not modify them.
+        """
+        if self._entity_json_version != self.state_version:
+            self._entity_json = {
+                "players": {entity_id: _entity_encoder.encode(entity)
+                            for entity_id, entity in self.players.items()},
+                "enemies": {entity_id: _entity_encoder.encode(entity)
+                            for entity_id, entity in self.enemies.items()},
+                "projectiles": {entity_id: _entity_encoder.encode(entity)
+                                for entity_id, entity in self.projectiles.items()},
+            }
+            self._entity_json_version = self.state_version
+        return self._entity_json
 
     def get_world_state(self) -> WorldStateData:
         """Get world layout state for client synchronization"""
+        for platform, state in self._moving_platform_states:
+            state.y = platform.y
+            state.moving_data = platform.moving_data
         return WorldStateData(
             world_seed=self.world_seed,
             world_width=self.world_width,
             world_height=self.world_height,
             ground_y=self.ground_y,
             left_boundary=self.left_boundary,
-            platforms=[PlatformState(**platform.to_dict()) for platform in self.platforms.values()]
+            platforms=self._platform_states
         )
 
     def has_players(self) -> bool:
@@ -458,14 +575,19 @@ class GameWorld:
         """Return player_id of closest player to object position"""
         if not self.players:
             return None
+        if len(self.players) == 1:
+            return next(iter(self.players))  # A sole player is trivially the closest
 
         closest_player = None
-        min_distance = float('inf')
+        min_distance_sq = float('inf')
 
+        # Squared distances compare the same as distances, no square root needed
         for player_id, player in self.players.items():
-            distance = ((player.x - object_x)**2 + (player.y - object_y)**2)**0.5
-            if distance < min_distance:
-                min_distance = distance
+            dx = player.x - object_x
+            dy = player.y - object_y
+            distance_sq = dx * dx + dy * dy
+            if distance_sq < min_distance_sq:
+                min_distance_sq = distance_sq
                 closest_player = player_id
 
         return closest_player
@@ -477,7 +599,7 @@ class GameWorld:
             old_authority = self.object_authorities.get(object_id)
             if old_authority != new_authority:
                 self.object_authorities[object_id] = new_authority
-                print(f"🏆 Authority for {object_id} transferred from {old_authority} to {new_authority}")
+                logger.debug("🏆 Authority for %s transferred from %s to %s", object_id, old_authority, new_authority)
 
     def get_object_authority(self, object_id: str) -> Optional[str]:
         """Get current authority for an object"""
@@ -487,59 +609,48 @@ class GameWorld:
         """Check if player has authority over an object"""
         return self.object_authorities.get(object_id) == player_id
 
-    def update_player_from_client(self, player_id: str, client_player_data: dict):
+    def update_player_from_client(self, player_id: str, update: ClientPlayerUpdate):
         """Update player state from client (players have authority over themselves)"""
-        if player_id not in self.players:
+        player = self.players.get(player_id)
+        if player is None:
             return
 
-        player = self.players[player_id]
-        player.x = client_player_data.get('x', player.x)
-        player.y = client_player_data.get('y', player.y)
-        player.velocity_x = client_player_data.get('velocity_x', player.velocity_x)
-        player.velocity_y = client_player_data.get('velocity_y', player.velocity_y)
-        player.facing_right = client_player_data.get('facing_right', player.facing_right)
-        player.is_grounded = client_player_data.get('is_grounded', player.is_grounded)
-        player.is_jumping = client_player_data.get('is_jumping', player.is_jumping)
-        player.health = client_player_data.get('health', player.health)
-        player.score = client_player_data.get('score', player.score)
-
-    def update_enemy_from_client(self, enemy_id: str, client_enemy_data: dict):
+        _apply_client_fields(player, update, "player_id")
+        self.mark_dirty()
+
+    def update_enemy_from_client(self, enemy_id: str, update: ClientEnemyUpdate):
         """Update enemy state from client (only if client has authority)"""
-        if enemy_id not in self.enemies:
+        enemy = self.enemies.get(enemy_id)
+        if enemy is None:
             return
 
-        enemy = self.enemies[enemy_id]
-        enemy.x = client_enemy_data.get('x', enemy.x)
-        enemy.y = client_enemy_data.get('y', enemy.y)
-        enemy.velocity_x = client_enemy_data.get('velocity_x', enemy.velocity_x)
-        enemy.velocity_y = client_enemy_data.get('velocity_y', enemy.velocity_y)
-        enemy.facing_right = client_enemy_data.get('facing_right', enemy.facing_right)
-        enemy.health = client_enemy_data.get('health', enemy.health)
+        _apply_client_fields(enemy, update, "enemy_id")
+        self.mark_dirty()
 
-    def update_projectile_from_client(self, projectile_id: str, client_projectile_data: dict):
+    def update_projectile_from_client(self, projectile_id: str, update: ClientProjectileUpdate):
         """Update or create projectile from client"""
-        if projectile_id not in self.projectiles:
+        projectile = self.projectiles.get(projectile_id)
+        if projectile is None:
             # Create new projectile from client
-            from uuid import uuid4
             projectile = ProjectileState(
                 projectile_id=projectile_id,
-                x=client_projectile_data.get('x', 0),
-                y=client_projectile_data.get('y', 0),
-                velocity_x=client_projectile_data.get('velocity_x', 0),
-                velocity_y=client_projectile_data.get('velocity_y', 0),
-                owner_id=client_projectile_data.get('owner_id', ''),
-                damage=client_projectile_data.get('damage', 25)
+                x=update.x if update.x is not None else 0,
+                y=update.y if update.y is not None else 0,
+                velocity_x=update.velocity_x if update.velocity_x is not None else 0,
+                velocity_y=update.velocity_y if update.velocity_y is not None else 0,
+                owner_id=update.owner_id,
+                damage=update.damage if update.damage is not None else 25
             )
             self.projectiles[projectile_id] = projectile
             # Set authority to owner
             self.object_authorities[projectile_id] = projectile.owner_id
         else:
-            # Update existing projectile
-            projectile = self.projectiles[projectile_id]
-            projectile.x = client_projectile_data.get('x', projectile.x)
-            projectile.y = client_projectile_data.get('y', projectile.y)
-            projectile.velocity_x = client_projectile_data.get('velocity_x', projectile.velocity_x)
-            projectile.velocity_y = client_projectile_data.get('velocity_y', projectile.velocity_y)
+            # Update existing projectile (position and velocity only, as before)
+            for field in ("x", "y", "velocity_x", "velocity_y"):
+                value = getattr(update, field)
+                if value is not None:
+                    setattr(projectile, field, value)
+        self.mark_dirty()
 
 
 class WorldManager:
@@ -549,10 +660,14 @@ class WorldManager:
         self.worlds: Dict[str, GameWorld] = {}
         self.update_task: Optional[asyncio.Task] = None
         self.running = False
+        self.connection_manager = None
 
     async def start(self):
         """Start the world update loop"""
         if not self.running:
+            # Resolved once here rather than per broadcast, importing at module level would be circular
+            from app.api.websocket import connection_manager
+            self.connection_manager = connection_manager
             self.running = True
             self.update_task = asyncio.create_task(self.update_loop())
 
@@ -583,49 +698,66 @@ class WorldManager:
             return True
         return False
 
-    async def update_loop(self):
-        """Main update loop for all worlds"""
-        last_time = time.time()
-        last_broadcast_time = time.time()
-        broadcast_frequency = 1 / 30  # 30fps server broadcasts
+    def update_worlds(self, delta_time: float):
+        """Advance every world with players by one step and drop the empty ones"""
+        worlds_to_remove = []
+        for room_id, world in self.worlds.items():
+            if world.has_players():
+                world.update(delta_time)
+            else:
+                # Mark empty worlds for removal
+                worlds_to_remove.append(room_id)
 
-        while self.running:
-            current_time = time.time()
-            delta_time = current_time - last_time
-            last_time = current_time
-
-            # Update all worlds
-            worlds_to_remove = []
-            for room_id, world in self.worlds.items():
-                if world.has_players():
-                    world.update(delta_time)
-                else:
-                    # Mark empty worlds for removal
-                    worlds_to_remove.append(room_id)
+        # Clean up empty worlds
+        for room_id in worlds_to_remove:
+            del self.worlds[room_id]
+
+    async def update_loop(self):
+        """Main update loop for all worlds
 
-            # Clean up empty worlds
-            for room_id in worlds_to_remove:
-                del self.worlds[room_id]
+        Worlds advance in fixed TICK_INTERVAL steps on a monotonic deadline schedule, so time
+        spent updating and broadcasting is subtracted from the sleep instead of added to the
+        tick length. Missed ticks are caught up with extra steps, up to MAX_CATCH_UP_TICKS;
+        after a longer stall the schedule restarts from now instead of bursting through it.
+        """
+        next_tick = time.monotonic_ns()
+        next_broadcast = next_tick
 
-            # Broadcast game state at 30fps
-            if current_time - last_broadcast_time >= broadcast_frequency:
+        while self.running:
+            if not self.worlds:
+                await asyncio.sleep(IDLE_INTERVAL)
+                next_tick = next_broadcast = time.monotonic_ns()
+                continue
+
+            # Run every tick that is due
+            now = time.monotonic_ns()
+            if now - next_tick > MAX_CATCH_UP_TICKS * TICK_INTERVAL_NS:
+                next_tick = now
+            while next_tick <= now:
+                self.update_worlds(TICK_INTERVAL)
+                next_tick += TICK_INTERVAL_NS
+
+            # Broadcast game state at 30fps, on its own deadline
+            if now >= next_broadcast:
                 await self.broadcast_all_world_states()
-                last_broadcast_time = current_time
+                next_broadcast = max(next_broadcast + BROADCAST_INTERVAL_NS, now)
 
-            # Target 60 FPS (16.67ms per frame)
-            await asyncio.sleep(1 / 60)
+            # Sleep until the next tick is due
+            delay = next_tick - time.monotonic_ns()
+            await asyncio.sleep(max(delay, 0) / 1e9)
 
     async def broadcast_all_world_states(self):
         """Broadcast current game state to all players in all worlds"""
-        # Import here to avoid circular import
-        from app.api.websocket import connection_manager
+        connection_manager = self.connection_manager
 
+        # One timestamp for the whole broadcast round
+        timestamp = asyncio.get_running_loop().time()
         for room_id, world in self.worlds.items():
             if world.has_players():
                 try:
-                    await connection_manager.broadcast_game_state(room_id)
+                    await connection_manager.broadcast_game_state(room_id, timestamp)
                 except Exception as e:
-                    print(f"❌ Error broadcasting game state for room {room_id}: {e}")
+                    logger.error("❌ Error broadcasting game state for room %s: %s", room_id, e)
 
 
 # Global world manager instance
@@ -3,6 +3,7 @@ Protocol definitions for client-server communication
 """
 from enum import Enum
 from typing import Any, Dict, Union, Optional, List
+import msgspec
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -23,11 +24,13 @@ class MessageType(str, Enum):
     ROOM_JOINED = "room_joined"
     ROOM_LEFT = "room_left"
     GAME_STATE = "game_state"
+    GAME_STATE_DELTA = "game_state_delta"  # Entities changed/removed since the previous game state
     WORLD_STATE = "world_state"
     PLAYER_JOINED = "player_joined"
     PLAYER_LEFT = "player_left"
     PONG = "pong"
     ERROR = "error"
+    BATCH = "batch"  # Several queued messages coalesced into one frame
 
 
 class ConnectionState(str, Enum):
@@ -55,14 +58,28 @@ class GameMessage(BaseModel):
     connection_state: Optional[ConnectionState] = None  # For state-based protocol
 
 
-class PlayerInputData(BaseModel):
+class InboundMessage(msgspec.Struct):
+    """Envelope of a client message, decoded and validated in one pass by msgspec
+
+    `type` stays a plain string so unknown types reach the handler lookup;
+    `data` is validated by the handler for that type.
+    """
+    type: str
+    timestamp: float
+    data: Any = None
+
+
+class PlayerInputData(msgspec.Struct):
     """Data structure for player input messages"""
     action: InputAction
     player_id: str
     pressed: bool = True  # True for key down, False for key up
 
 
-class PlayerState(BaseModel):
+# Entity states are mutated every tick and encoded at 30fps, so they are msgspec structs
+# (cheap attribute writes, fast JSON encoding) rather than pydantic models. They only hold
+# scalars, so they can opt out of cyclic garbage collection.
+class PlayerState(msgspec.Struct, gc=False):
     """Player state data"""
     player_id: str
     username: str
@@ -78,7 +95,7 @@ class PlayerState(BaseModel):
     is_shooting: bool = False
 
 
-class ProjectileState(BaseModel):
+class ProjectileState(msgspec.Struct, gc=False):
     """Projectile state data"""
     projectile_id: str
     x: float
@@ -89,7 +106,7 @@ class ProjectileState(BaseModel):
     damage: int = 25
 
 
-class EnemyState(BaseModel):
+class EnemyState(msgspec.Struct, gc=False):
     """Enemy state data"""
     enemy_id: str
     enemy_type: str
@@ -122,7 +139,7 @@ class WorldStateData(BaseModel):
     platforms: List[PlatformState]
 
 
-class GameStateData(BaseModel):
+class GameStateData(msgspec.Struct):
     """Complete game state data"""
     room_id: str
     tick: int
@@ -131,7 +148,7 @@ class GameStateData(BaseModel):
     projectiles: list[ProjectileState]
 
 
-class JoinRoomData(BaseModel):
+class JoinRoomData(msgspec.Struct):
     """Data for joining a room"""
     room_name: str
     username: str
@@ -144,25 +161,68 @@ class ErrorData(BaseModel):
     message: str
 
 
-class ReadyForWorldData(BaseModel):
+class ReadyForWorldData(msgspec.Struct):
     """Client acknowledgment that it's ready to receive world state"""
     room_id: str
     player_id: str
 
 
-class WorldReadyData(BaseModel):
+class WorldReadyData(msgspec.Struct):
     """Client acknowledgment that world state was received and processed"""
     room_id: str
     player_id: str
     world_seed: int  # Confirm received world seed
 
 
-class ClientReadyData(BaseModel):
+class ClientReadyData(msgspec.Struct):
     """Client acknowledgment that initialization is complete"""
     room_id: str
     player_id: str
 
 
+class ClientPlayerUpdate(msgspec.Struct):
+    """Player fields a client reports for itself; omitted (None) fields keep the server value"""
+    player_id: str
+    x: Optional[float] = None
+    y: Optional[float] = None
+    velocity_x: Optional[float] = None
+    velocity_y: Optional[float] = None
+    facing_right: Optional[bool] = None
+    is_grounded: Optional[bool] = None
+    is_jumping: Optional[bool] = None
+    health: Optional[int] = None
+    score: Optional[int] = None
+
+
+class ClientEnemyUpdate(msgspec.Struct):
+    """Enemy fields a client reports, applied only if it has authority over the enemy"""
+    enemy_id: str
+    x: float
+    y: float
+    velocity_x: Optional[float] = None
+    velocity_y: Optional[float] = None
+    facing_right: Optional[bool] = None
+    health: Optional[int] = None
+
+
+class ClientProjectileUpdate(msgspec.Struct):
+    """Projectile fields a client reports, applied only for its own projectiles"""
+    projectile_id: str
+    owner_id: str
+    x: Optional[float] = None
+    y: Optional[float] = None
+    velocity_x: Optional[float] = None
+    velocity_y: Optional[float] = None
+    damage: Optional[int] = None
+
+
+class ClientStateUpdate(msgspec.Struct):
+    """Data of a game_state_update message"""
+    player: Optional[ClientPlayerUpdate] = None
+    enemies: List[ClientEnemyUpdate] = []
+    projectiles: List[ClientProjectileUpdate] = []
+
+
 # Message type mapping for easier validation
 MESSAGE_DATA_TYPES = {
     MessageType.JOIN_ROOM: JoinRoomData,
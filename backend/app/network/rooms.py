@@ -1,6 +1,7 @@
 """
 Room management for multiplayer games using PostgreSQL
 """
+import logging
 from typing import Dict, Set, Optional, List
 from datetime import datetime
 from uuid import UUID
@@ -9,6 +10,8 @@ from app.config.settings import settings
 from app.database.repository import GameRepository
 from app.database.models import GameRoom as DbGameRoom, GameSession, Player
 
+logger = logging.getLogger(__name__)
+
 
 class GameRoom:
     """Represents a multiplayer game room with database backing"""
@@ -23,6 +26,8 @@ class GameRoom:
 
         # Active connections (connection_id -> session info)
         self._active_connections: Dict[str, GameSession] = {}
+        self._usernames: Dict[str, str] = {}  # connection_id -> username, recorded on join
+        self._player_list_cache: Optional[list] = None  # Rebuilt after joins/leaves
         if active_sessions:
             for session in active_sessions:
                 # We'll need connection_id mapping elsewhere
@@ -42,6 +47,8 @@ class GameRoom:
             )
 
             self._active_connections[connection_id] = session
+            self._usernames[connection_id] = player.username
+            self._player_list_cache = None
             return True
 
     def remove_player(self, connection_id: str) -> bool:
@@ -56,6 +63,8 @@ class GameRoom:
             repo.end_game_session(session.id)
 
         del self._active_connections[connection_id]
+        self._usernames.pop(connection_id, None)
+        self._player_list_cache = None
         return True
 
     def is_empty(self) -> bool:
@@ -67,17 +76,17 @@ class GameRoom:
         return len(self._active_connections) >= self.max_players
 
     def get_player_list(self) -> list:
-        """Get list of players with usernames"""
-        players = []
-        with GameRepository() as repo:
-            for connection_id, session in self._active_connections.items():
-                player = repo.get_player_by_id(session.player_id)
-                players.append({
+        """Get list of players with usernames (cached until the next join/leave)"""
+        if self._player_list_cache is None:
+            self._player_list_cache = [
+                {
                     "connection_id": connection_id,
-                    "username": player.username if player else "Unknown",
+                    "username": self._usernames.get(connection_id, "Unknown"),
                     "character_type": session.character_type
-                })
-        return players
+                }
+                for connection_id, session in self._active_connections.items()
+            ]
+        return self._player_list_cache
 
     def get_active_connection_count(self) -> int:
         """Get number of active connections"""
@@ -99,6 +108,7 @@ class RoomManager:
         # In-memory cache of active rooms for performance
         self._room_cache: Dict[str, GameRoom] = {}
         self._connection_rooms: Dict[str, str] = {}  # connection_id -> room_id
+        self._active_games = 0  # Rooms with more than one player, updated on join/leave
 
     def create_room(self, name: str, creator_connection_id: str, player: Player) -> GameRoom:
         """Create a new room"""
@@ -113,7 +123,7 @@ class RoomManager:
             if room.add_player(creator_connection_id, player):
                 self._room_cache[room.room_id] = room
                 self._connection_rooms[creator_connection_id] = room.room_id
-                print(f"Created room {room.room_id} '{name}' by {player.username}")
+                logger.info("Created room %s '%s' by %s", room.room_id, name, player.username)
                 return room
             else:
                 # This shouldn't happen for a new room, but handle it
@@ -143,7 +153,9 @@ class RoomManager:
                     # Join existing room
                     if room.add_player(connection_id, player):
                         self._connection_rooms[connection_id] = room.room_id
-                        print(f"Player {player.username} joined room {room.room_id}")
+                        if room.get_active_connection_count() == 2:
+                            self._active_games += 1
+                        logger.info("Player %s joined room %s", player.username, room.room_id)
                         return room
                     else:
                         return None
@@ -165,7 +177,9 @@ class RoomManager:
         if room.remove_player(connection_id):
             # Remove from connection mapping
             del self._connection_rooms[connection_id]
-            print(f"Player {connection_id} left room {room_id}")
+            if room.get_active_connection_count() == 1:
+                self._active_games -= 1
+            logger.info("Player %s left room %s", connection_id, room_id)
 
             # Clean up empty rooms
             if room.is_empty():
@@ -173,7 +187,7 @@ class RoomManager:
                 # Deactivate room in database
                 with GameRepository() as repo:
                     repo.deactivate_room(room.db_id)
-                print(f"Deactivated empty room {room_id}")
+                logger.info("Deactivated empty room %s", room_id)
 
             return room
 
@@ -204,6 +218,14 @@ class RoomManager:
             })
         return rooms
 
+    def get_stats(self) -> dict:
+        """Get room statistics from running counters"""
+        return {
+            "total_rooms": len(self._room_cache),
+            "total_players": len(self._connection_rooms),
+            "active_games": self._active_games
+        }
+
     def cleanup_empty_rooms(self) -> int:
         """Remove empty rooms"""
         empty_room_ids = [
@@ -1,8 +1,9 @@
 """
 Session management for WebSocket connections using PostgreSQL
 """
+import time
 import uuid
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from uuid import UUID
 
@@ -10,9 +11,29 @@ from app.database.repository import GameRepository
 from app.database.models import Player
 
 
+# Seconds a player looked up by session ID is served from memory
+PLAYER_CACHE_TTL = 60.0
+# Every join uses a new session ID, so the cache is bounded
+PLAYER_CACHE_MAX_SIZE = 1024
+
+
 class SessionManager:
     """Manages user sessions using PostgreSQL backend"""
 
+    def __init__(self):
+        # session_id -> (detached player, monotonic expiry)
+        self._player_cache: Dict[str, Tuple[Player, float]] = {}
+
+    def _cache_player(self, session_id: str, player: Player):
+        """Remember a loaded player for PLAYER_CACHE_TTL seconds"""
+        now = time.monotonic()
+        if len(self._player_cache) >= PLAYER_CACHE_MAX_SIZE:
+            # Drop expired entries, then the oldest ones if still full
+            self._player_cache = {sid: entry for sid, entry in self._player_cache.items() if entry[1] > now}
+            while len(self._player_cache) >= PLAYER_CACHE_MAX_SIZE:
+                del self._player_cache[next(iter(self._player_cache))]
+        self._player_cache[session_id] = (player, now + PLAYER_CACHE_TTL)
+
     def generate_session_id(self) -> str:
         """Generate a unique session ID"""
         return str(uuid.uuid4())
@@ -29,21 +50,31 @@ class SessionManager:
                     # Update existing player's session
                     repo.update_player_session(player.id, session_id)
                 else:
-                    # Create new player
-                    repo.create_player(username=username, session_id=session_id)
+                    # Create new player (refreshed after insert, so it can be served from the cache)
+                    self._cache_player(session_id, repo.create_player(username=username, session_id=session_id))
             else:
                 # Anonymous player
-                repo.create_player(username=f"Guest_{session_id[:8]}", session_id=session_id)
+                self._cache_player(session_id, repo.create_player(username=f"Guest_{session_id[:8]}", session_id=session_id))
 
         return session_id
 
     def get_player_by_session(self, session_id: str) -> Optional[Player]:
-        """Get player by session ID"""
+        """Get player by session ID, from the cache while it is fresh"""
+        cached = self._player_cache.get(session_id)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
         with GameRepository() as repo:
-            return repo.get_player_by_session_id(session_id)
+            player = repo.get_player_by_session_id(session_id)
+        if player:
+            self._cache_player(session_id, player)
+        else:
+            self._player_cache.pop(session_id, None)
+        return player
 
     def update_session_activity(self, session_id: str):
         """Update session activity (last seen timestamp)"""
+        self._player_cache.pop(session_id, None)
         with GameRepository() as repo:
             player = repo.get_player_by_session_id(session_id)
             if player:
@@ -51,6 +82,7 @@ class SessionManager:
 
     def remove_session(self, session_id: str):
         """Remove session by clearing session_id from player"""
+        self._player_cache.pop(session_id, None)
         with GameRepository() as repo:
             player = repo.get_player_by_session_id(session_id)
             if player:
@@ -60,6 +92,7 @@ class SessionManager:
     def cleanup_expired_sessions(self, timeout_minutes: int = 30) -> int:
         """Clean up expired sessions using repository cleanup"""
         timeout_hours = timeout_minutes / 60.0
+        self._player_cache.clear()
         with GameRepository() as repo:
             return repo.cleanup_old_sessions(hours_ago=int(timeout_hours))
 
@@ -0,0 +1,226 @@
+"""
+Tests for the game WebSocket: state broadcasts, inbound limits and batching
+"""
+import asyncio
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi.websockets import WebSocketDisconnect, WebSocketState
+
+from app.api import websocket
+from app.api.websocket import (
+    ConnectionManager, INPUT_BURST, KEYFRAME_INTERVAL_TICKS, MAX_BATCH_SIZE, MAX_MESSAGE_SIZE
+)
+from app.game.world import TICK_INTERVAL, world_manager
+from app.network.protocol import InputAction, MessageType
+
+
+ROOM_ID = "test-room"
+
+
+class FakeWebSocket:
+    """Records the text frames a connection's writer sends"""
+
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload: str):
+        self.frames.append(orjson.loads(payload))
+
+
+async def drain(fake: FakeWebSocket) -> list:
+    """Let the writer send everything queued, returning the messages with batches unpacked"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+    messages = []
+    for frame in fake.frames:
+        if frame["type"] == MessageType.BATCH:
+            messages.extend(frame["data"]["messages"])
+        else:
+            messages.append(frame)
+    fake.frames.clear()
+    return messages
+
+
+@pytest.fixture
+def world():
+    """A world registered with the global world manager, removed again afterwards"""
+    world = world_manager.create_world(ROOM_ID)
+    yield world
+    world_manager.remove_world(ROOM_ID)
+
+
+async def connect(manager: ConnectionManager, connection_id: str, room_id: str = ROOM_ID) -> FakeWebSocket:
+    """Connect a fake WebSocket and put it in a room"""
+    fake = FakeWebSocket()
+    await manager.connect(fake, connection_id)
+    manager.set_room_id(connection_id, room_id)
+    return fake
+
+
+def test_keyframe_every_interval(world):
+    """A full game_state goes out every KEYFRAME_INTERVAL_TICKS, deltas in between"""
+    async def run():
+        manager = ConnectionManager()
+        fake = await connect(manager, "p1")
+        player = world.add_player("p1", "alice")
+
+        types = {}
+        for _ in range(KEYFRAME_INTERVAL_TICKS * 2 + 1):
+            world.tick += 1
+            player.x += 1
+            world.mark_dirty()
+            await manager.broadcast_game_state(ROOM_ID, 1.0)
+            (message,) = await drain(fake)
+            types[message["data"]["tick"]] = message["type"]
+        manager.disconnect("p1")
+        return types
+
+    types = asyncio.run(run())
+    first_tick = min(types)
+    for tick, message_type in types.items():
+        if (tick - first_tick) % KEYFRAME_INTERVAL_TICKS == 0:
+            assert message_type == MessageType.GAME_STATE
+        else:
+            assert message_type == MessageType.GAME_STATE_DELTA
+
+
+def test_delta_contains_only_changes(world):
+    """A delta lists the entities whose state changed and the ids of removed ones"""
+    async def run():
+        manager = ConnectionManager()
+        fake = await connect(manager, "p1")
+        alice = world.add_player("p1", "alice")
+        world.add_player("p2", "bob")
+        await manager.broadcast_game_state(ROOM_ID, 1.0)
+        (keyframe,) = await drain(fake)
+
+        world.tick += 1
+        alice.x += 10
+        world.remove_player("p2")
+        await manager.broadcast_game_state(ROOM_ID, 1.0)
+        (delta,) = await drain(fake)
+        manager.disconnect("p1")
+        return keyframe, delta
+
+    keyframe, delta = asyncio.run(run())
+    assert keyframe["type"] == MessageType.GAME_STATE
+    assert {player["player_id"] for player in keyframe["data"]["players"]} == {"p1", "p2"}
+
+    assert delta["type"] == MessageType.GAME_STATE_DELTA
+    players = delta["data"]["players"]
+    assert [player["player_id"] for player in players["updated"]] == ["p1"]
+    assert players["updated"][0]["x"] == world.players["p1"].x
+    assert players["removed"] == ["p2"]
+    assert delta["data"]["enemies"] == {"updated": [], "removed": []}
+    assert delta["data"]["projectiles"] == {"updated": [], "removed": []}
+
+
+def test_unchanged_world_is_not_broadcast(world):
+    """Ticks that leave every entity as it was do not produce a broadcast"""
+    async def run():
+        manager = ConnectionManager()
+        fake = await connect(manager, "p1")
+        world.add_player("p1", "alice")
+        for enemy in world.enemies.values():
+            enemy.velocity_x = 0
+
+        # Let the player and enemies settle on the ground
+        for _ in range(30):
+            world.update(TICK_INTERVAL)
+        await manager.broadcast_game_state(ROOM_ID, 1.0)
+        await drain(fake)
+
+        for _ in range(10):
+            world.update(TICK_INTERVAL)
+            await manager.broadcast_game_state(ROOM_ID, 1.0)
+        messages = await drain(fake)
+        manager.disconnect("p1")
+        return messages
+
+    assert asyncio.run(run()) == []
+
+
+def test_input_over_rate_is_dropped(world, monkeypatch):
+    """Player inputs beyond the token bucket burst are not forwarded to the world"""
+    forwarded = []
+    monkeypatch.setattr(world, "handle_player_input",
+                        lambda player_id, action, pressed: forwarded.append(action))
+
+    async def run():
+        manager = ConnectionManager()
+        monkeypatch.setattr(websocket, "connection_manager", manager)
+        fake = await connect(manager, "p1")
+        data = {"action": InputAction.MOVE_RIGHT, "player_id": "p1", "pressed": True}
+        for _ in range(int(INPUT_BURST) + 20):
+            await websocket.handle_player_input("p1", data, 1.0)
+        messages = await drain(fake)
+        manager.disconnect("p1")
+        return messages
+
+    messages = asyncio.run(run())
+    # Refill during the loop is a fraction of a token at most
+    assert len(forwarded) == int(INPUT_BURST)
+    assert messages == []
+
+
+def test_allow_input_refills_over_time(monkeypatch):
+    """The input bucket refills at INPUT_RATE tokens per second"""
+    async def run():
+        manager = ConnectionManager()
+        await connect(manager, "p1", room_id=None)
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        monkeypatch.setattr(loop, "time", lambda: now)
+        allowed = sum(manager.allow_input("p1") for _ in range(int(INPUT_BURST) + 1))
+        monkeypatch.setattr(loop, "time", lambda: now + 0.105)
+        refilled = sum(manager.allow_input("p1") for _ in range(10))
+        manager.disconnect("p1")
+        return allowed, refilled
+
+    allowed, refilled = asyncio.run(run())
+    assert allowed == int(INPUT_BURST)
+    assert refilled == int(0.105 * websocket.INPUT_RATE)
+
+
+@pytest.mark.parametrize("payload", [
+    "x" * (MAX_MESSAGE_SIZE + 1),
+    # Under the limit in characters, over it in UTF-8 bytes
+    "é" * (MAX_MESSAGE_SIZE // 2 + 1),
+])
+def test_oversize_frame_closes_with_1009(payload):
+    """Frames larger than MAX_MESSAGE_SIZE bytes close the connection with code 1009"""
+    app = FastAPI()
+    app.include_router(websocket.router)
+    with TestClient(app) as client:
+        with client.websocket_connect("/game") as connection:
+            connection.send_text(payload)
+            with pytest.raises(WebSocketDisconnect) as disconnect:
+                connection.receive_text()
+    assert disconnect.value.code == 1009
+
+
+def test_writer_batches_queued_messages():
+    """Messages queued since the last send go out as one batch frame of at most MAX_BATCH_SIZE"""
+    async def run():
+        manager = ConnectionManager()
+        fake = await connect(manager, "p1", room_id=None)
+        for index in range(MAX_BATCH_SIZE + 5):
+            manager.send_raw("p1", orjson.dumps({"type": MessageType.PONG, "timestamp": index, "data": {}}))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        manager.disconnect("p1")
+        return fake.frames
+
+    frames = asyncio.run(run())
+    assert [frame["type"] for frame in frames] == [MessageType.BATCH, MessageType.BATCH]
+    messages = [message for frame in frames for message in frame["data"]["messages"]]
+    assert len(frames[0]["data"]["messages"]) == MAX_BATCH_SIZE
+    assert [message["timestamp"] for message in messages] == list(range(MAX_BATCH_SIZE + 5))
@@ -41,6 +41,9 @@ export class NetworkSystem {
   // Enemy collision setup callback
   private onEnemiesUpdated: (() => void) | null = null;
 
+  // Last server game state by entity id; game_state_delta messages are applied to it
+  private serverEntities: Record<string, Map<string, any>> | null = null;
+
   constructor(scene: Phaser.Scene) {
     this.scene = scene;
   }
@@ -120,9 +123,14 @@ export class NetworkSystem {
     }
 
     this.networkManager.onMessage("game_state", (data) => {
+      this.storeServerEntities(data);
       this.handleGameStateUpdate(data);
     });
 
+    this.networkManager.onMessage("game_state_delta", (data) => {
+      this.handleGameStateDelta(data);
+    });
+
     this.networkManager.onMessage("world_state", (data) => {
       this.handleWorldStateUpdate(data);
     });
@@ -137,6 +145,7 @@ export class NetworkSystem {
     this.roomJoinConfirmed = true;
     this.connectionState = ConnectionState.ROOM_JOINED;
     this.currentRoomId = data.room_id;
+    this.serverEntities = null;
     
     if (data.your_player_id) {
       this.myPlayerId = data.your_player_id;
@@ -232,6 +241,43 @@ export class NetworkSystem {
     });
   }
 
+  private storeServerEntities(gameState: any) {
+    this.serverEntities = {
+      players: new Map((gameState.players || []).map((p: any) => [p.player_id, p])),
+      enemies: new Map((gameState.enemies || []).map((e: any) => [e.enemy_id, e])),
+      projectiles: new Map(
+        (gameState.projectiles || []).map((p: any) => [p.projectile_id, p])
+      ),
+    };
+  }
+
+  private handleGameStateDelta(delta: any) {
+    // Deltas are relative to a full state; wait for the next keyframe without one
+    if (!this.serverEntities) return;
+
+    const idFields: Record<string, string> = {
+      players: "player_id",
+      enemies: "enemy_id",
+      projectiles: "projectile_id",
+    };
+    const gameState: any = { room_id: delta.room_id, tick: delta.tick };
+    for (const [collection, idField] of Object.entries(idFields)) {
+      const entities = this.serverEntities[collection];
+      const changes = delta[collection];
+      if (changes) {
+        for (const entity of changes.updated) {
+          entities.set(entity[idField], entity);
+        }
+        for (const entityId of changes.removed) {
+          entities.delete(entityId);
+        }
+      }
+      gameState[collection] = Array.from(entities.values());
+    }
+
+    this.handleGameStateUpdate(gameState);
+  }
+
   private handleGameStateUpdate(gameState: any) {
     // Check if this is the initial game state (first one after world ready)
     if (this.connectionState === ConnectionState.WORLD_SENT) {
@@ -227,8 +227,25 @@ export class NetworkManager {
     try {
       const message: GameMessage = JSON.parse(data);
 
+      // The server coalesces queued messages into a single batch frame
+      if (message.type === "batch") {
+        for (const batchedMessage of message.data.messages as GameMessage[]) {
+          this.dispatchMessage(batchedMessage);
+        }
+      } else {
+        this.dispatchMessage(message);
+      }
+    } catch (error) {
+      console.error("Error parsing message:", error);
+    }
+  }
+
+  private dispatchMessage(message: GameMessage): void {
+    try {
       // Only log important messages, not every game_state update
-      if (message.type !== "game_state") {
+      const isGameState =
+        message.type === "game_state" || message.type === "game_state_delta";
+      if (!isGameState) {
         console.log("📨 NetworkManager: Received message:", message.type);
       }
 
@@ -254,12 +271,12 @@ export class NetworkManager {
         handler(message.data);
       } else {
         // Don't spam unhandled game_state messages during initialization
-        if (message.type !== "game_state") {
+        if (!isGameState) {
           console.warn("❌ NetworkManager: Unhandled message type:", message.type, message.data);
         }
       }
     } catch (error) {
-      console.error("Error parsing message:", error);
+      console.error("Error handling message:", error);
     }
   }
 
@@ -22,129 +22,179 @@ Usage:
 
 import cv2
 import numpy as np
-from PIL import Image, ImageDraw, ImageFilter
+import argparse
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from skimage import feature, measure, segmentation
 from skimage.color import rgb2gray
 
-def analyze_tileset(image_path):
-    """Analyze the tileset using advanced computer vision techniques"""
+# Fast PNG settings for small extracted tiles (zlib level 1 instead of the default 6)
+TILE_PNG_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+# Backgrounds have long runs of flat color, which RLE encodes quickly at nearly the same size
+BACKGROUND_PNG_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 2, cv2.IMWRITE_PNG_STRATEGY, cv2.IMWRITE_PNG_STRATEGY_RLE]
+
+
+def encode_tile(tile, params=TILE_PNG_PARAMS):
+    """Encode a BGR(A) tile slice to PNG bytes with OpenCV using fast compression"""
+    ok, encoded = cv2.imencode('.png', tile, params)
+    if not ok:
+        raise ValueError("Could not encode tile as PNG")
+    return encoded.tobytes()
+
+
+def save_tile(filename, tile, params=TILE_PNG_PARAMS):
+    """Save a BGR(A) tile slice with OpenCV using fast PNG compression"""
+    with open(filename, 'wb') as f:
+        f.write(encode_tile(tile, params))
+
+
+def analyze_tileset(image_path, detect_grid_lines=False, create_visualization=True):
+    """Analyze the tileset using advanced computer vision techniques
+    
+    Canny/Hough grid line detection is skipped unless detect_grid_lines is set.
+    create_visualization=False skips drawing and writing the visualization image.
+    """
     
-    # Load the image with OpenCV and PIL
-    cv_img = cv2.imread(image_path)
-    pil_img = Image.open(image_path)
+    # Decode the image once, keeping alpha for the extracted tiles
+    tile_pixels = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
     
-    if cv_img is None:
+    if tile_pixels is None:
         print(f"Error: Could not load image {image_path}")
         return
     
-    height, width = cv_img.shape[:2]
-    print(f"Image size: {width}x{height} (width x height)")
-    
-    # Convert to RGB for processing
-    cv_img_rgb = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
+    if tile_pixels.dtype != np.uint8:
+        tile_pixels = (tile_pixels >> 8).astype(np.uint8)  # 16-bit PNGs
+    if tile_pixels.ndim == 2:
+        tile_pixels = cv2.cvtColor(tile_pixels, cv2.COLOR_GRAY2BGR)
     
-    print("\n=== ADVANCED TILE BOUNDARY DETECTION ===")
-    
-    # 1. Edge detection using Canny
-    gray = cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+    # The analysis itself works on 3-channel BGR
+    if tile_pixels.shape[2] == 4:
+        cv_img = cv2.cvtColor(tile_pixels, cv2.COLOR_BGRA2BGR)
+    else:
+        cv_img = tile_pixels
     
-    # 2. Line detection using Hough Transform
-    lines = cv2.HoughLines(edges, 1, np.pi/180, threshold=200)
+    height, width = cv_img.shape[:2]
+    print(f"Image size: {width}x{height} (width x height)")
     
-    horizontal_lines = []
-    vertical_lines = []
+    horizontal_lines = np.empty(0, dtype=np.int32)
+    vertical_lines = np.empty(0, dtype=np.int32)
     
-    if lines is not None:
-        for rho, theta in lines[:, 0]:
-            # Classify lines as horizontal or vertical
+    # The tile size is chosen by divisibility below, so line detection is optional diagnostics
+    if detect_grid_lines:
+        print("\n=== ADVANCED TILE BOUNDARY DETECTION ===")
+        
+        # 1. Edge detection using Canny on a downsampled image (16x fewer pixels)
+        scale = 4
+        gray = cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, (max(1, width // scale), max(1, height // scale)), interpolation=cv2.INTER_AREA)
+        edges = cv2.Canny(small, 50, 150, apertureSize=3)
+        
+        # 2. Line detection using Hough Transform (lines are 4x shorter, so is the vote threshold)
+        lines = cv2.HoughLines(edges, 1, np.pi/180, threshold=200 // scale)
+        
+        if lines is not None:
+            # Classify all lines at once as horizontal or vertical
+            rho = lines[:, 0, 0] * scale  # Back to full-resolution coordinates
+            theta = lines[:, 0, 1]
             angle = theta * 180 / np.pi
-            if abs(angle) < 10 or abs(angle - 180) < 10:  # Horizontal lines
-                y = int(rho / np.sin(theta)) if np.sin(theta) != 0 else None
-                if y and 0 < y < height:
-                    horizontal_lines.append(y)
-            elif abs(angle - 90) < 10:  # Vertical lines
-                x = int(rho / np.cos(theta)) if np.cos(theta) != 0 else None
-                if x and 0 < x < width:
-                    vertical_lines.append(x)
-    
-    print(f"Detected {len(horizontal_lines)} horizontal grid lines")
-    print(f"Detected {len(vertical_lines)} vertical grid lines")
+            h_mask = (np.abs(angle) < 10) | (np.abs(angle - 180) < 10)  # Horizontal lines
+            v_mask = np.abs(angle - 90) < 10  # Vertical lines
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ys = rho / np.sin(theta)
+                xs = rho / np.cos(theta)
+            
+            # Truncate like int() before the range check, dropping non-finite positions
+            ys = np.trunc(ys[h_mask & np.isfinite(ys)])
+            xs = np.trunc(xs[v_mask & np.isfinite(xs)])
+            # Kept as int32 arrays (no per-line Python ints) for downstream vector ops
+            horizontal_lines = ys[(ys > 0) & (ys < height)].astype(np.int32)
+            vertical_lines = xs[(xs > 0) & (xs < width)].astype(np.int32)
+        
+        print(f"Detected {len(horizontal_lines)} horizontal grid lines")
+        print(f"Detected {len(vertical_lines)} vertical grid lines")
     
     # 3. Template matching for common tile sizes
     print("\n=== TILE SIZE ANALYSIS ===")
     
-    # Check if image dimensions fit common tile sizes
-    common_sizes = [16, 32, 48, 64]
-    best_tile_size = None
-    
-    for size in common_sizes:
-        h_tiles = height // size
-        v_tiles = width // size
-        h_remainder = height % size
-        v_remainder = width % size
-        
-        print(f"  {size}x{size}: {v_tiles}x{h_tiles} tiles (remainder: {v_remainder}x{h_remainder})")
-        
-        if h_remainder == 0 and v_remainder == 0:
-            best_tile_size = size
+    # Check if image dimensions fit common tile sizes (one table for all candidates)
+    common_sizes = np.array([16, 32, 48, 64])
+    h_tiles, h_remainder = np.divmod(height, common_sizes)
+    v_tiles, v_remainder = np.divmod(width, common_sizes)
+    fits = (h_remainder == 0) & (v_remainder == 0)
+    best_tile_size = int(common_sizes[fits].max()) if fits.any() else None
+    
+    table = zip(common_sizes.tolist(), v_tiles.tolist(), h_tiles.tolist(),
+                v_remainder.tolist(), h_remainder.tolist(), fits.tolist())
+    for size, v_count, h_count, v_rem, h_rem, fit in table:
+        print(f"  {size}x{size}: {v_count}x{h_count} tiles (remainder: {v_rem}x{h_rem})")
+        if fit:
             print(f"    ✓ Perfect fit for {size}x{size} tiles!")
     
     # 4. Color-based segmentation to identify distinct regions
     print("\n=== WINTER-THEMED REGION DETECTION ===")
     
-    # Convert to LAB color space for better color analysis
-    lab_img = cv2.cvtColor(cv_img_rgb, cv2.COLOR_RGB2LAB)
+    # Convert to LAB color space for better color analysis (directly from BGR)
+    lab_img = cv2.cvtColor(cv_img, cv2.COLOR_BGR2Lab)
     
     # Define winter color ranges (blues, whites, light grays)
     # In LAB: L=lightness, A=green-red, B=blue-yellow
-    winter_regions = []
-    
-    # Create masks for winter colors
-    # High lightness (whites/light colors)
-    white_mask = lab_img[:,:,0] > 180
     
-    # Blue tones (negative B values)
-    blue_mask = lab_img[:,:,2] < 110
+    # Only L and B are read, so pull them out as contiguous planes once and
+    # let the comparisons below run over tight strides
+    lightness = cv2.extractChannel(lab_img, 0)
+    blue_yellow = cv2.extractChannel(lab_img, 2)
+    del lab_img
     
-    # Combine masks
-    winter_mask = white_mask | blue_mask
-    
-    # Find connected components
-    num_labels, labels = cv2.connectedComponents(winter_mask.astype(np.uint8))
-    
-    # Analyze each region
-    for label in range(1, num_labels):
-        region_mask = (labels == label)
-        region_area = np.sum(region_mask)
-        
-        if region_area > 500:  # Filter small regions
-            # Get bounding box
-            coords = np.where(region_mask)
-            y_min, y_max = coords[0].min(), coords[0].max()
-            x_min, x_max = coords[1].min(), coords[1].max()
-            
-            # Calculate winter score based on color properties
-            region_pixels = cv_img_rgb[region_mask]
-            avg_color = np.mean(region_pixels, axis=0)
-            brightness = np.mean(avg_color)
-            blue_ratio = avg_color[2] / (np.sum(avg_color) + 1e-6)
-            
-            winter_score = brightness * 0.6 + blue_ratio * 100 * 0.4
-            
-            winter_regions.append({
-                'bbox': (x_min, y_min, x_max, y_max),
-                'area': region_area,
-                'avg_color': avg_color,
-                'winter_score': winter_score
-            })
-    
-    # Sort by winter score
-    winter_regions.sort(key=lambda x: x['winter_score'], reverse=True)
+    # Create the winter color mask in a single output buffer
+    # High lightness (whites/light colors)
+    winter_mask = np.greater(lightness, 180)
+    
+    # Blue tones (negative B values), computed into the no longer needed B plane
+    # and combined in place, so no further full-size temporary is allocated
+    np.less(blue_yellow, 110, out=blue_yellow)
+    np.logical_or(winter_mask, blue_yellow, out=winter_mask)
+    
+    # Find connected components (bounding boxes and areas in a single pass)
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(
+        winter_mask.view(np.uint8), 8, cv2.CV_32S)
+    
+    # Filter small regions up front instead of scanning the label image per label
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    keep = np.where(areas > 500)[0] + 1
+    
+    # Region properties are kept as parallel arrays, one row per region
+    x_min = stats[keep, cv2.CC_STAT_LEFT]
+    y_min = stats[keep, cv2.CC_STAT_TOP]
+    x_max = x_min + stats[keep, cv2.CC_STAT_WIDTH] - 1
+    y_max = y_min + stats[keep, cv2.CC_STAT_HEIGHT] - 1
+    bboxes = np.stack([x_min, y_min, x_max, y_max], axis=1)
+    region_areas = stats[keep, cv2.CC_STAT_AREA]
+    avg_colors = np.empty((len(keep), 3))
+    
+    # Average color of each remaining region
+    for i, (label, (x1, y1, x2, y2)) in enumerate(zip(keep, bboxes)):
+        # Average over the region's pixels, restricted to its bounding box
+        roi_mask = (labels[y1:y2 + 1, x1:x2 + 1] == label).view(np.uint8)
+        avg_colors[i] = cv2.mean(cv_img[y1:y2 + 1, x1:x2 + 1], roi_mask)[2::-1]  # BGR -> RGB
+    
+    # Calculate winter scores based on color properties, for all regions at once
+    brightness = avg_colors.mean(axis=1)
+    blue_ratio = avg_colors[:, 2] / (avg_colors.sum(axis=1) + 1e-6)
+    winter_scores = brightness * 0.6 + blue_ratio * 100 * 0.4
+    
+    # Sort by winter score (stable, so ties keep label order)
+    order = np.argsort(-winter_scores, kind='stable')
+    winter_regions = {
+        'bbox': bboxes[order],
+        'area': region_areas[order],
+        'avg_color': avg_colors[order],
+        'winter_score': winter_scores[order]
+    }
+    num_winter_regions = len(order)
     
-    print(f"Found {len(winter_regions)} potential winter regions")
+    print(f"Found {num_winter_regions} potential winter regions")
     
     # 5. Extract and save tile samples
     print("\n=== EXTRACTING TILE SAMPLES ===")
@@ -163,6 +213,9 @@ def analyze_tileset(image_path):
     
     print(f"Grid: {cols} columns x {rows} rows")
     
+    # Tiles are sliced from the decoded image without copying
+    tile_jobs = []  # (filename, tile slice) pairs encoded in parallel below
+    
     # Focus on areas that might contain winter tiles
     # Based on your description: "second row middle" and "lower right"
     
@@ -177,9 +230,8 @@ def analyze_tileset(image_path):
             x = col * tile_size
             y = row * tile_size
             
-            tile = pil_img.crop((x, y, x + tile_size, y + tile_size))
             filename = f'tile_second_row_middle_{col}.png'
-            tile.save(filename)
+            tile_jobs.append((filename, tile_pixels[y:y + tile_size, x:x + tile_size]))
             print(f"  Saved: {filename} (position {x},{y})")
             tiles_extracted += 1
     
@@ -199,8 +251,8 @@ def analyze_tileset(image_path):
         bg_width = lr_cols * tile_size
         bg_height = lr_rows * tile_size
         
-        background = pil_img.crop((bg_x, bg_y, bg_x + bg_width, bg_y + bg_height))
-        background.save('winter_background_detected.png')
+        background = tile_pixels[bg_y:bg_y + bg_height, bg_x:bg_x + bg_width]
+        save_tile('winter_background_detected.png', background, BACKGROUND_PNG_PARAMS)
         print(f"  Saved: winter_background_detected.png ({bg_width}x{bg_height} at {bg_x},{bg_y})")
         
         # Also extract individual tiles from this area
@@ -209,43 +261,47 @@ def analyze_tileset(image_path):
                 x = col * tile_size
                 y = row * tile_size
                 
-                tile = pil_img.crop((x, y, x + tile_size, y + tile_size))
                 filename = f'tile_lower_right_{row-start_row}_{col-start_col}.png'
-                tile.save(filename)
+                tile_jobs.append((filename, tile_pixels[y:y + tile_size, x:x + tile_size]))
                 tiles_extracted += 1
     
-    # 6. Create visualization
-    print(f"\n=== CREATING VISUALIZATION ===")
-    
-    # Create a copy for visualization
-    vis_img = cv_img_rgb.copy()
-    
-    # Draw grid lines
-    if best_tile_size:
-        tile_size = best_tile_size
-        for i in range(0, width, tile_size):
-            cv2.line(vis_img, (i, 0), (i, height), (255, 0, 0), 1)
-        for i in range(0, height, tile_size):
-            cv2.line(vis_img, (0, i), (width, i), (255, 0, 0), 1)
-    
-    # Highlight winter regions
-    for i, region in enumerate(winter_regions[:5]):  # Top 5
-        x1, y1, x2, y2 = region['bbox']
-        color = [(255,0,0), (0,255,0), (0,0,255), (255,255,0), (255,0,255)][i]
-        cv2.rectangle(vis_img, (x1, y1), (x2, y2), color, 3)
-        cv2.putText(vis_img, f'{i+1}', (x1+5, y1+20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-    
-    # Save visualization
-    cv2.imwrite('tileset_analysis_visualization.png', cv2.cvtColor(vis_img, cv2.COLOR_RGB2BGR))
+    # Encode all tiles concurrently in memory (OpenCV releases the GIL while
+    # encoding PNGs), then write the files in one tight loop
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        buffers = list(executor.map(lambda job: encode_tile(job[1]), tile_jobs))
+    for (filename, _), buffer in zip(tile_jobs, buffers):
+        with open(filename, 'wb') as f:
+            f.write(buffer)
     
     print(f"Extracted {tiles_extracted} tile samples")
-    print("Saved visualization: tileset_analysis_visualization.png")
+    
+    # 6. Create visualization
+    if create_visualization:
+        print(f"\n=== CREATING VISUALIZATION ===")
+        
+        # Draw directly on the BGR image, it is not used after this point
+        vis_img = cv_img
+        
+        # Draw grid lines as strided writes instead of one cv2.line call per line
+        if best_tile_size:
+            vis_img[:, ::best_tile_size] = (0, 0, 255)  # Red (BGR)
+            vis_img[::best_tile_size, :] = (0, 0, 255)
+        
+        # Highlight winter regions
+        for i, (x1, y1, x2, y2) in enumerate(winter_regions['bbox'][:5].tolist()):  # Top 5
+            color = [(0,0,255), (0,255,0), (255,0,0), (0,255,255), (255,0,255)][i]  # BGR
+            cv2.rectangle(vis_img, (x1, y1), (x2, y2), color, 3)
+            cv2.putText(vis_img, f'{i+1}', (x1+5, y1+20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        
+        # Save visualization
+        cv2.imwrite('tileset_analysis_visualization.png', vis_img)
+        print("Saved visualization: tileset_analysis_visualization.png")
     
     print(f"\n=== SUMMARY ===")
     print(f"Best tile size detected: {best_tile_size or 'Unknown (using 32x32)'}x{best_tile_size or 32}")
-    print(f"Winter regions found: {len(winter_regions)}")
-    if winter_regions:
-        print(f"Best winter region score: {winter_regions[0]['winter_score']:.1f}")
+    print(f"Winter regions found: {num_winter_regions}")
+    if num_winter_regions:
+        print(f"Best winter region score: {winter_regions['winter_score'][0]:.1f}")
     
     return {
         'tile_size': best_tile_size or 32,
@@ -254,14 +310,19 @@ def analyze_tileset(image_path):
     }
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 analyze_tileset.py <image_path>")
-        sys.exit(1)
-    
-    image_path = sys.argv[1]
+    parser = argparse.ArgumentParser(description='Analyze a tileset and extract winter-themed tiles')
+    parser.add_argument('image_path', help='Path to the tileset image')
+    parser.add_argument('--grid-lines', action='store_true',
+                        help='Also detect grid lines with Canny edge detection and Hough transforms')
+    parser.add_argument('--no-viz', action='store_true',
+                        help='Skip creating tileset_analysis_visualization.png')
+    args = parser.parse_args()
+    
+    image_path = args.image_path
     if not os.path.exists(image_path):
         print(f"Error: File {image_path} not found")
         sys.exit(1)
     
-    result = analyze_tileset(image_path)
+    result = analyze_tileset(image_path, detect_grid_lines=args.grid_lines,
+                             create_visualization=not args.no_viz)
     print("\nAnalysis complete! Check the extracted tile files.")
\ No newline at end of file